@@ -0,0 +1,207 @@
+import json
+import asyncio
+import argparse
+import tracemalloc
+from random import Random
+from types import SimpleNamespace
+from statistics import quantiles
+from time import perf_counter_ns
+
+import core.infractions
+import events.automod
+from events.automod import AutoModerator
+from benchmarks.fakes import FakeBot, FakeRole, FakeMessage, FakeThread
+
+
+GUILD_ID = 1
+LOG_CHANNEL_ID = 900
+IGNORED_ROLE_ID = 20
+HELPER_ROLE_ID = 11
+RMOD_ROLE_ID = 13
+
+WORDS = ('hello', 'stream', 'video', 'channel', 'subscribe', 'thanks', 'anyone', 'editing', 'thumbnail', 'upload',
+         'views', 'camera', 'audio', 'collab', 'growth', 'algorithm', 'shorts', 'live', 'lighting', 'script')
+
+
+class SimulatedClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def synthetic_corpus(args: argparse.Namespace) -> list[dict]:
+    rng = Random(args.seed)
+    tenor_role = AutoModerator.TENOR_ROLES[0]
+    records, sent = [], []
+
+    for i in range(args.messages):
+        timestamp = i / args.rate
+        if sent and rng.random() < args.edit_ratio:
+            record = dict(rng.choice(sent), event='edit', timestamp=timestamp)
+            record['content'] = record['content'] + ' (edited)' if rng.random() < 0.5 else record['content']
+            records.append(record)
+            continue
+
+        author_id = rng.randint(1000, 1000 + args.users)
+        role_ids, roll = [], rng.random()
+        text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 16)))
+
+        if roll < 0.10:
+            content = f'{text} https://youtube.com/watch?v={rng.randint(0, 10 ** 9)}'
+        elif roll < 0.13:
+            content = f'{text} https://blacklisted-{rng.randint(0, args.domains - 1)}.example/x'
+        elif roll < 0.18:
+            content = f'{text} https://unknown-{rng.randint(0, 10 ** 6)}.example/path'
+        elif roll < 0.21:
+            content = f'{text} https://discord.com/channels/{GUILD_ID}/{rng.randint(1, 40)}/{i}'
+        elif roll < 0.25:
+            role_ids.append(tenor_role)
+            content = f'https://tenor.com/view/gif-{rng.randint(0, 10 ** 6)}'
+        elif roll < 0.30:
+            role_ids.append(IGNORED_ROLE_ID)
+            content = f'{text} https://unknown-{rng.randint(0, 10 ** 6)}.example'
+        elif roll < 0.35:
+            role_ids.append(rng.choice((HELPER_ROLE_ID, RMOD_ROLE_ID)))
+            content = f'{text} https://unknown-{rng.randint(0, 10 ** 6)}.example'
+        else:
+            content = text
+
+        record = {
+            'event': 'message',
+            'message_id': 10 ** 6 + i,
+            'author_id': author_id,
+            'channel_id': rng.randint(100, 100 + args.channels - 1),
+            'thread_id': 5000 + rng.randint(0, 20) if rng.random() < args.thread_ratio else None,
+            'role_ids': role_ids,
+            'content': content,
+            'timestamp': timestamp
+        }
+        records.append(record)
+        sent.append(record)
+
+    return records
+
+
+def load_corpus(path: str) -> list[dict]:
+    with open(path) as corpus_file:
+        return [json.loads(line) for line in corpus_file if line.strip()]
+
+
+def build_bot(args: argparse.Namespace) -> FakeBot:
+    bot = FakeBot(
+        guild_id=GUILD_ID,
+        automod_channel=LOG_CHANNEL_ID,
+        helper_role=HELPER_ROLE_ID,
+        rmod_role=RMOD_ROLE_ID,
+        domain_wl=['youtube.com'] + [f'whitelisted-{i}.example' for i in range(args.domains)],
+        domain_bl=[f'blacklisted-{i}.example' for i in range(args.domains)],
+        auto_mod_ignored_roles=[IGNORED_ROLE_ID],
+        auto_mod_ignored_channels=[])
+    bot.add_channel(LOG_CHANNEL_ID)
+    return bot
+
+
+def build_events(bot: FakeBot, records: list[dict]) -> list[tuple[str, float, FakeMessage]]:
+    roles: dict[int, FakeRole] = {}
+    threads: dict[int, FakeThread] = {}
+    built = []
+
+    for record in records:
+        channel = bot.guild.get_channel(record['channel_id']) or bot.add_channel(record['channel_id'])
+        thread_id = record.get('thread_id')
+        if thread_id:
+            channel = threads.get(thread_id) or threads.setdefault(thread_id, FakeThread(bot.calls, thread_id, channel))
+
+        author = bot.guild.get_member(record['author_id']) or bot.add_member(
+            record['author_id'], [roles.setdefault(_id, FakeRole(_id)) for _id in record.get('role_ids', [])])
+
+        # Edits arrive as a fresh object for the same message ID, just like the `message` of on_raw_message_edit
+        message = FakeMessage(bot.calls, record['message_id'], record['content'], author, channel)
+        built.append((record['event'], record['timestamp'], message))
+
+    return built
+
+
+async def replay(cog: AutoModerator, stream: list[tuple[str, float, FakeMessage]], clock: SimulatedClock) -> list[int]:
+    latencies = []
+    for event, timestamp, message in stream:
+        clock.now = timestamp
+        start = perf_counter_ns()
+        if event == 'edit':
+            await cog.on_raw_message_edit(SimpleNamespace(message=message))
+        else:
+            await cog.on_message(message)
+        latencies.append(perf_counter_ns() - start)
+    await cog.flush_logs()
+    return latencies
+
+
+async def run(args: argparse.Namespace) -> None:
+    records = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args)
+    if args.dump:
+        with open(args.dump, 'w') as dump_file:
+            dump_file.writelines(json.dumps(record) + '\n' for record in records)
+
+    clock = SimulatedClock()
+    events.automod.time = core.infractions.time = clock
+
+    bot = build_bot(args)
+    stream = build_events(bot, records)
+    cog = AutoModerator(bot)
+
+    start = perf_counter_ns()
+    latencies = await replay(cog, stream, clock)
+    elapsed = (perf_counter_ns() - start) / 1e9
+
+    p = quantiles(latencies, n=100)
+    print(f'{len(stream):,} events ({sum(1 for e in stream if e[0] == "edit"):,} edits) - '
+          f'{len(bot.metadata.domain_wl) + len(bot.metadata.domain_bl):,} listed domains')
+    print(f'Throughput: {len(stream) / elapsed:,.0f} messages/s ({elapsed:.3f}s)')
+    print(f'Latency: p50={p[49] / 1e3:.1f}us p90={p[89] / 1e3:.1f}us p99={p[98] / 1e3:.1f}us '
+          f'max={max(latencies) / 1e3:.1f}us')
+    print(f'Edits: {cog.edits_checked:,} re-moderated, {cog.edits_skipped:,} skipped as unchanged')
+    print(f'Stubbed calls: {bot.calls}')
+
+    if args.no_alloc:
+        return
+
+    bot = build_bot(args)
+    stream = build_events(bot, records)
+    cog = AutoModerator(bot)
+
+    tracemalloc.start(10)
+    before = tracemalloc.take_snapshot()
+    await replay(cog, stream, clock)
+    current, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    filters = [tracemalloc.Filter(True, '*/events/*'), tracemalloc.Filter(True, '*/core/*')]
+    top = after.filter_traces(filters).compare_to(before.filter_traces(filters), 'lineno')[:args.top]
+    print(f'Allocations: peak={peak / 1024:,.1f}KiB retained={current / 1024:,.1f}KiB')
+    for stat in top:
+        print(f'  {stat}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Replay a message corpus through AutoModerator with HTTP stubbed.')
+    parser.add_argument('--corpus', help='JSONL corpus to replay instead of a synthetic one.')
+    parser.add_argument('--dump', help='Write the replayed corpus to this JSONL file.')
+    parser.add_argument('--messages', type=int, default=50000)
+    parser.add_argument('--rate', type=float, default=50, help='Simulated messages per second.')
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--channels', type=int, default=40)
+    parser.add_argument('--domains', type=int, default=200, help='Size of each of the domain white/blacklists.')
+    parser.add_argument('--edit-ratio', type=float, default=0.1)
+    parser.add_argument('--thread-ratio', type=float, default=0.1)
+    parser.add_argument('--top', type=int, default=5, help='Number of allocation sites to list.')
+    parser.add_argument('--no-alloc', action='store_true', help='Skip the tracemalloc pass.')
+    parser.add_argument('--seed', type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
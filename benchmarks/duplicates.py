@@ -0,0 +1,52 @@
+import argparse
+from random import Random
+from time import perf_counter
+
+from core.duplicates import DuplicateDetector
+
+
+WORDS = ('hello', 'free', 'nitro', 'stream', 'video', 'channel', 'subscribe', 'thanks', 'anyone', 'editing',
+         'thumbnail', 'upload', 'views', 'camera', 'audio', 'collab', 'growth', 'algorithm', 'shorts', 'live')
+
+COPYPASTA = 'FREE NITRO for everyone!! claim it here before it runs out <@123456789012345678>'
+
+
+def corpus(rate: int, seconds: int, raid_ratio: float, seed: int) -> list[tuple[str, int, int, float]]:
+    rng = Random(seed)
+    messages = []
+    for i in range(rate * seconds):
+        now = i / rate
+        if rng.random() < raid_ratio:
+            content = COPYPASTA
+        else:
+            content = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 14)))
+        messages.append((content, rng.randint(1, 5000), rng.randint(1, 40), now))
+    return messages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Per-message overhead of the cross-channel duplicate detector.')
+    parser.add_argument('--rate', type=int, default=1000, help='Simulated messages per second.')
+    parser.add_argument('--seconds', type=int, default=60, help='Simulated duration of the stream.')
+    parser.add_argument('--raid-ratio', type=float, default=0.05, help='Fraction of messages that are copypasta.')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    messages = corpus(args.rate, args.seconds, args.raid_ratio, args.seed)
+    detector = DuplicateDetector()
+
+    flagged = 0
+    start = perf_counter()
+    for content, user_id, channel_id, now in messages:
+        flagged += len(detector.check(content, user_id, channel_id, now, user_id))
+    elapsed = perf_counter() - start
+
+    per_message = elapsed / len(messages) * 1e6
+    print(f'{len(messages):,} messages at {args.rate:,}/s simulated')
+    print(f'Total: {elapsed:.3f}s - {per_message:.2f}us/message - {len(messages) / elapsed:,.0f} messages/s')
+    print(f'Budget used at {args.rate:,}/s: {per_message * args.rate / 1e4:.2f}% of one core')
+    print(f'Flagged: {flagged:,} - Clusters held: {len(detector):,}')
+
+
+if __name__ == '__main__':
+    main()
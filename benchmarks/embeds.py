@@ -0,0 +1,124 @@
+import asyncio
+import argparse
+import tracemalloc
+from random import Random
+from types import SimpleNamespace
+from time import perf_counter
+
+from discord import Embed, Color
+
+from core.dispatch import EmbedQueue
+from events.logger import EventLogger
+from benchmarks.fakes import FakeBot, FakeRole, FakeMember
+
+
+LOG_TYPES = (
+    ('Member Joined VC', Color.green), ('Member Left VC', Color.red), ('Member Switched VCs', Color.blue),
+    ('Member Role(s) Added', Color.blue), ('Member Joined', Color.green), ('Member Left', Color.red),
+    ('Message Deleted', Color.red), ('Modlog Created', Color.blue)
+)
+
+
+class LegacyFactory:
+
+    # Mirrors the pre-factory handlers: a fresh author block and avatar resolution for every embed
+    def __init__(self, bot: FakeBot):
+        self.bot = bot
+
+    @property
+    def icon_url(self):
+        return self.bot.user.avatar or self.bot.user.default_avatar
+
+    def build(self, author: str, color: Color, description: str | None = None, cls: type[Embed] = Embed) -> Embed:
+        embed = cls(color=color, description=description)
+        embed.set_author(name=author, icon_url=self.bot.user.avatar or self.bot.user.default_avatar)
+        return embed
+
+
+def build_rate(factory, count: int) -> float:
+    start = perf_counter()
+    for i in range(count):
+        author, color = LOG_TYPES[i % len(LOG_TYPES)]
+        factory.build(author, color(), f'<@{i}>')
+    return count / (perf_counter() - start)
+
+
+def event_stream(bot: FakeBot, count: int, seed: int) -> list[tuple[str, tuple]]:
+    rng = Random(seed)
+    roles = [FakeRole(100 + i) for i in range(5)]
+    channels = [SimpleNamespace(id=500 + i, mention=f'<#{500 + i}>') for i in range(4)]
+    members = [bot.add_member(10 ** 17 + i, roles[:rng.randint(0, 3)]) for i in range(500)]
+
+    events = []
+    for _ in range(count):
+        member, roll = rng.choice(members), rng.random()
+        if roll < 0.6:
+            before, after = rng.choice([None] + channels), rng.choice([None] + channels)
+            events.append(('on_voice_state_update', (
+                member, SimpleNamespace(channel=before), SimpleNamespace(channel=after))))
+        elif roll < 0.8:
+            after = FakeMember(bot.calls, member.id, member.roles + [rng.choice(roles)], guild=bot.guild)
+            events.append(('on_member_update', (member, after)))
+        elif roll < 0.9:
+            events.append(('on_member_join', (member,)))
+        else:
+            events.append(('on_member_remove', (member,)))
+    return events
+
+
+def new_logger(legacy: bool, events: int, seed: int) -> tuple[EventLogger, list[tuple[str, tuple]]]:
+    bot = FakeBot(logging_channel=900, log_digest={event: -1 for event in EventLogger.DIGEST_THRESHOLDS})
+    bot.add_channel(900)
+    if legacy:
+        bot.embed_factory = LegacyFactory(bot)
+    logger = EventLogger(bot)
+    logger.dispatcher.LIMITS = {EmbedQueue.NORMAL: events, EmbedQueue.LOW: events}
+    return logger, event_stream(bot, events, seed)
+
+
+async def replay(logger: EventLogger, events: list[tuple[str, tuple]], alloc: bool) -> tuple[float, int, int]:
+    handlers = [(getattr(logger, name), args) for name, args in events]
+    if alloc:
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+
+    start = perf_counter()
+    for handler, args in handlers:
+        await handler(*args)
+    elapsed = perf_counter() - start
+
+    blocks = size = 0
+    if alloc:
+        stats = tracemalloc.take_snapshot().compare_to(before, 'filename')
+        tracemalloc.stop()
+        blocks = sum(stat.count_diff for stat in stats)
+        size = sum(stat.size_diff for stat in stats)
+    return elapsed, blocks, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Embeds built per second with and without the embed factory.')
+    parser.add_argument('--builds', type=int, default=200000, help='Bare embeds to build per factory.')
+    parser.add_argument('--events', type=int, default=20000, help='Logger events to replay per factory.')
+    parser.add_argument('--no-alloc', action='store_true', help='Skip allocation tracing of the replay.')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for name, legacy in ('legacy', True), ('factory', False):
+        logger, events = new_logger(legacy, args.events, args.seed)
+        rate = build_rate(logger.bot.embed_factory, args.builds)
+        elapsed, _, _ = asyncio.run(replay(logger, events, False))
+        queued = len(logger.dispatcher)
+
+        print(f'[{name}] {rate:,.0f} bare embeds/s - replay: {queued:,} embeds from {len(events):,} events '
+              f'in {elapsed:.3f}s ({queued / elapsed:,.0f} embeds/s)')
+
+        if not args.no_alloc:
+            logger, events = new_logger(legacy, args.events, args.seed)
+            _, blocks, size = asyncio.run(replay(logger, events, True))
+            print(f'[{name}] Retained by queued embeds: {blocks:,} blocks, {size / 1024:,.0f} KiB '
+                  f'({blocks / max(len(logger.dispatcher), 1):.1f} blocks/embed)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+from datetime import datetime, timedelta, timezone
+
+from discord.abc import GuildChannel
+from discord import Thread, Permissions, Asset
+
+from main import CustomBot
+from core.metadata import MetaData
+from core.embed import EmbedFactory
+
+
+class Calls:
+
+    def __init__(self):
+        self.counts: dict[str, int] = {}
+
+    def __call__(self, name: str, amount: int = 1) -> None:
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+    def __str__(self) -> str:
+        return ', '.join(f'{name}={count:,}' for name, count in sorted(self.counts.items())) or 'none'
+
+
+class FakeRole:
+
+    def __init__(self, role_id: int, name: str = 'role'):
+        self.id = role_id
+        self.name = name
+        self.icon = None
+
+    @property
+    def mention(self) -> str:
+        return f'<@&{self.id}>'
+
+
+class FakeMember:
+
+    def __init__(self, calls: Calls, user_id: int, roles: list[FakeRole] = None, bot: bool = False, **kwargs):
+        self.calls = calls
+        self.id = user_id
+        self.name = kwargs.get('name', f'user{user_id}')
+        self.nick = kwargs.get('nick')
+        self.roles = roles or []
+        self.bot = bot
+        self.guild = kwargs.get('guild')
+        self._avatar: str | None = kwargs.get('avatar')
+        self.created_at = kwargs.get('created_at', datetime(2020, 1, 1, tzinfo=timezone.utc))
+        self.timed_out_until: datetime | None = None
+
+    def __str__(self) -> str:
+        return self.name
+
+    @property
+    def display_name(self) -> str:
+        return self.nick or self.name
+
+    @property
+    def mention(self) -> str:
+        return f'<@{self.id}>'
+
+    @property
+    def avatar(self) -> Asset | None:
+        # Built on every access, as discord.py does
+        return Asset._from_avatar(None, self.id, self._avatar) if self._avatar else None
+
+    @property
+    def default_avatar(self) -> Asset:
+        # Built on every access, as discord.py does
+        return Asset._from_default_avatar(None, (self.id >> 22) % 6)
+
+    def is_timed_out(self) -> bool:
+        return self.timed_out_until is not None
+
+    async def timeout(self, duration: timedelta | None, **_) -> None:
+        self.calls('member.timeout')
+        self.timed_out_until = datetime.now(timezone.utc) + duration if duration else None
+
+
+class _Messageable:
+
+    calls: Calls
+
+    async def send(self, *_, **__) -> None:
+        self.calls('channel.send')
+
+    async def delete_messages(self, messages: list, **_) -> None:
+        self.calls('channel.delete_messages')
+        self.calls('messages.bulk_deleted', len(messages))
+
+
+class FakeTextChannel(_Messageable, GuildChannel):
+
+    def __init__(self, calls: Calls, channel_id: int, guild: 'FakeGuild', attach_files: bool = True):
+        self.calls = calls
+        self.id = channel_id
+        self.name = f'channel-{channel_id}'
+        self.guild = guild
+        self.attach_files = attach_files
+
+    def permissions_for(self, _) -> Permissions:
+        return Permissions(attach_files=self.attach_files)
+
+
+class FakeThread(_Messageable, Thread):
+
+    def __init__(self, calls: Calls, thread_id: int, parent: FakeTextChannel):
+        self.calls = calls
+        self.id = thread_id
+        self.name = f'thread-{thread_id}'
+        self.guild = parent.guild
+        self.parent_id = parent.id
+
+
+class FakeMessage:
+
+    def __init__(self, calls: Calls, message_id: int, content: str, author: FakeMember, channel, **kwargs):
+        self.calls = calls
+        self.id = message_id
+        self.content = content
+        self.author = author
+        self.channel = channel
+        self.guild = channel.guild
+        self.attachments = kwargs.get('attachments', [])
+        self.created_at = kwargs.get('created_at', datetime.now(timezone.utc))
+
+    @property
+    def jump_url(self) -> str:
+        return f'https://discord.com/channels/{self.guild.id}/{self.channel.id}/{self.id}'
+
+    async def delete(self, **_) -> None:
+        self.calls('message.delete')
+
+
+class FakeGuild:
+
+    def __init__(self, calls: Calls, guild_id: int):
+        self.calls = calls
+        self.id = guild_id
+        self.name = 'Benchmark Guild'
+        self.icon = None
+        self.owner = None
+        self.channels: dict[int, FakeTextChannel] = {}
+        self.members: dict[int, FakeMember] = {}
+
+    def get_channel(self, channel_id: int) -> FakeTextChannel | None:
+        return self.channels.get(channel_id)
+
+    def get_member(self, user_id: int) -> FakeMember | None:
+        return self.members.get(user_id)
+
+    def get_role(self, _) -> None:
+        return
+
+
+class FakeMongo:
+
+    def __init__(self, calls: Calls):
+        self.calls = calls
+        self._case_id = 0
+
+    async def reserve_modlog_ids(self, count: int = 1) -> int:
+        self.calls('mongo.reserve_modlog_ids')
+        self._case_id += count
+        return self._case_id - count + 1
+
+    async def new_modlog_id(self) -> int:
+        return await self.reserve_modlog_ids()
+
+    async def insert_modlog(self, **kwargs) -> dict:
+        self.calls('mongo.insert_modlog')
+        return kwargs
+
+    async def insert_modlogs(self, entries: list[dict]) -> list[dict]:
+        self.calls('mongo.insert_modlogs')
+        await self.reserve_modlog_ids(len(entries))
+        return entries
+
+    async def get_infractions(self) -> list[dict]:
+        return []
+
+    async def dump_infractions(self, _) -> None:
+        self.calls('mongo.dump_infractions')
+
+
+class FakeArchive:
+
+    def __init__(self, calls: Calls):
+        self.calls = calls
+
+    def record(self, *_) -> None:
+        self.calls('archive.record')
+
+    async def flush(self) -> int:
+        return 0
+
+
+class FakeBot:
+
+    # Borrow the real implementation so clearance resolution costs the same as in production
+    member_clearance = CustomBot.member_clearance
+
+    def __init__(self, guild_id: int = 1, **metadata):
+        self.calls = Calls()
+        self.guild_id = guild_id
+        self.guild = FakeGuild(self.calls, guild_id)
+        self.owner_ids: set[int] = set()
+        self.user = FakeMember(self.calls, 1, name='YCC Utilities', bot=True, avatar='0123456789abcdef0123456789abcdef')
+        self.mongo_db = FakeMongo(self.calls)
+        self.metadata = MetaData(self, **metadata)
+        self.command_prefix = '!'
+        self.perm_duration = 2 ** 32 - 1
+        self.raid_mode = False
+        self.log_sink = None
+        self.archive = FakeArchive(self.calls)
+        self.embed_factory = EmbedFactory(self)
+
+    def get_cog(self, _) -> None:
+        return
+
+    def add_channel(self, channel_id: int, attach_files: bool = True) -> FakeTextChannel:
+        channel = self.guild.channels[channel_id] = FakeTextChannel(self.calls, channel_id, self.guild, attach_files)
+        return channel
+
+    def add_member(self, user_id: int, roles: list[FakeRole] = None) -> FakeMember:
+        member = self.guild.members[user_id] = FakeMember(self.calls, user_id, roles, guild=self.guild)
+        return member
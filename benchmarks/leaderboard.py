@@ -0,0 +1,49 @@
+import argparse
+from random import Random
+from time import perf_counter
+
+from core.leaderboard import top, rank
+
+
+def legacy(totals: dict[int, int], target: int, k: int) -> tuple[list[tuple[int, int]], int | None]:
+    # Mirrors the pre-heap path: a full sort, then a list conversion to slice and to index
+    ordered = {key: value for key, value in sorted(totals.items(), key=lambda x: x[1], reverse=True)}
+    try:
+        position = list(ordered).index(target) + 1
+    except ValueError:
+        position = None
+    return [(key, ordered[key]) for key in list(ordered)[:k]], position
+
+
+def selection(totals: dict[int, int], target: int, k: int) -> tuple[list[tuple[int, int]], int | None]:
+    return top(totals, k), rank(totals, target)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Top-k and single-rank lookups over one activity window.')
+    parser.add_argument('--users', type=int, default=100000, help='Distinct users in the window.')
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = Random(args.seed)
+    # Message counts are heavily skewed, most users post a handful of times
+    totals = {10 ** 17 + i: int(rng.paretovariate(1.2)) for i in range(args.users)}
+    targets = [rng.choice(list(totals)) for _ in range(args.repeat)]
+
+    results = {}
+    for name, func in ('legacy', legacy), ('heapq', selection):
+        start = perf_counter()
+        results[name] = [func(totals, target, args.top) for target in targets]
+        elapsed = (perf_counter() - start) / args.repeat
+        print(f'[{name}] {args.users:,} users: {elapsed * 1e3:,.2f}ms per top-{args.top} + rank lookup')
+
+    # Ties may be ordered differently, but the values and competition ranks must agree
+    assert all([value for _, value in a[0]] == [value for _, value in b[0]]
+               for a, b in zip(results['legacy'], results['heapq']))
+    assert all(b[1] <= a[1] for a, b in zip(results['legacy'], results['heapq']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+import asyncio
+import argparse
+import tracemalloc
+from random import Random
+from time import time, perf_counter
+
+from ext.userstats import UserStatistics
+from benchmarks.fakes import FakeBot, FakeMessage
+
+
+class LegacyBuffer:
+
+    # Mirrors the pre-columnar cog: one dict per message, copied with a comprehension on flush
+    def __init__(self):
+        self.msg_stats = []
+
+    async def on_message(self, message: FakeMessage) -> None:
+        if not message.guild or message.guild.id != 1 or message.author.bot:
+            return
+
+        msg_dict = {
+            'user_id': message.author.id,
+            'message_id': message.id,
+            'channel_id': message.channel.id,
+            'created': time()
+        }
+        self.msg_stats.append(msg_dict)
+
+    def flush(self) -> list[dict]:
+        _msg = [_ for _ in self.msg_stats]
+        self.msg_stats = []
+        return _msg
+
+
+class ColumnarBuffer:
+
+    def __init__(self, bot: FakeBot):
+        self.cog = UserStatistics(bot)
+        self.on_message = self.cog.on_message
+
+    def flush(self) -> list[dict]:
+        _msg, self.cog.msg_stats = self.cog.msg_stats, self.cog.msg_stats.empty()
+        return _msg.documents()
+
+
+def build_messages(bot: FakeBot, count: int, users: int, channels: int, seed: int) -> list[FakeMessage]:
+    rng = Random(seed)
+    members = [bot.add_member(10 ** 17 + i) for i in range(users)]
+    rooms = [bot.add_channel(10 ** 16 + i) for i in range(channels)]
+    return [FakeMessage(bot.calls, 10 ** 18 + i, '', rng.choice(members), rng.choice(rooms)) for i in range(count)]
+
+
+async def measure(buffer, messages: list[FakeMessage]) -> tuple[float, int, float]:
+    start = perf_counter()
+    for message in messages:
+        await buffer.on_message(message)
+    append_time = perf_counter() - start
+
+    start = perf_counter()
+    documents = buffer.flush()
+    flush_time = perf_counter() - start
+    assert len(documents) == len(messages)
+    del documents
+
+    # A second, traced pass measures what the buffer holds between flushes
+    tracemalloc.start()
+    for message in messages:
+        await buffer.on_message(message)
+    buffered = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    buffer.flush()
+    return append_time, buffered, flush_time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Memory and time of the user statistics message buffer.')
+    parser.add_argument('--events', type=int, default=100000, help='Messages buffered between flushes.')
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--channels', type=int, default=40)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    bot = FakeBot()
+    messages = build_messages(bot, args.events, args.users, args.channels, args.seed)
+    scale = 100000 / args.events
+
+    for name, buffer in ('legacy', LegacyBuffer()), ('columnar', ColumnarBuffer(bot)):
+        append_time, buffered, flush_time = asyncio.run(measure(buffer, messages))
+        print(f'[{name}] per 100k events: append {append_time * scale * 1e3:,.1f}ms, '
+              f'buffered {buffered * scale / 1024:,.0f} KiB, flush to documents {flush_time * scale * 1e3:,.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
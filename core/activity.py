@@ -0,0 +1,69 @@
+from math import ceil
+from datetime import datetime, timezone, timedelta
+
+
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+SHADES = ' ░▒▓█'
+SPARKS = '▁▂▃▄▅▆▇█'
+
+
+def floor_hour(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def floor_day(moment: datetime) -> datetime:
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def floor_month(moment: datetime) -> datetime:
+    return floor_day(moment).replace(day=1)
+
+
+def next_day(moment: datetime) -> datetime:
+    return floor_day(moment) + timedelta(days=1)
+
+
+def next_month(moment: datetime) -> datetime:
+    return floor_month(floor_month(moment) + timedelta(days=32))
+
+
+def activity_updates(changes: dict[int, dict[str, dict[int, int | float]]], server_id: int) -> list[dict]:
+    # Hourly leaderboard totals -> one increment per (scope, target, hour), the server row sums every user
+    entries = []
+    for hour, totals in changes.items():
+        for scope, messages, vc_time in (('user', totals['umc'], totals['uvt']),
+                                         ('channel', totals['cmc'], totals['cvt'])):
+            for target_id in messages.keys() | vc_time.keys():
+                entries.append({'scope': scope, 'target_id': target_id, 'hour': hour,
+                                'messages': messages.get(target_id, 0), 'vc_time': vc_time.get(target_id, 0)})
+        entries.append({'scope': 'server', 'target_id': server_id, 'hour': hour,
+                        'messages': sum(totals['umc'].values()), 'vc_time': sum(totals['uvt'].values())})
+    return entries
+
+
+def heatmap(buckets: list[dict], field: str) -> str:
+    grid = [[0] * 24 for _ in WEEKDAYS]
+    for bucket in buckets:
+        hour = datetime.fromtimestamp(bucket.get('start', 0), tz=timezone.utc)
+        grid[hour.weekday()][hour.hour] += bucket.get(field, 0)
+
+    peak = max(max(row) for row in grid) or 1
+    lines = [(' ' * 4 + ''.join(f'{hour:<6}' for hour in range(0, 24, 6))).rstrip()]
+    for weekday, row in zip(WEEKDAYS, grid):
+        lines.append(f'{weekday} ' + ''.join(SHADES[ceil(value / peak * (len(SHADES) - 1))] for value in row))
+    return '\n'.join(lines)
+
+
+def daily_series(buckets: list[dict], field: str, since: float, now: float) -> list[int | float]:
+    days = int(now // 86400 - since // 86400) + 1
+    series = [0] * days
+    for bucket in buckets:
+        day = int(bucket.get('start', 0) // 86400 - since // 86400)
+        if 0 <= day < days:
+            series[day] += bucket.get(field, 0)
+    return series
+
+
+def sparkline(values: list[int | float]) -> str:
+    peak = max(values, default=0) or 1
+    return ''.join(SPARKS[round(value / peak * (len(SPARKS) - 1))] for value in values)
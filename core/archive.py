@@ -0,0 +1,90 @@
+import asyncio
+import sqlite3
+from time import time
+from threading import Lock
+
+
+class EventArchive:
+
+    PATH = 'archive.db'
+    RETENTION = 7776000
+    SUMMARY_LIMIT = 1000
+
+    _schema = (
+        'CREATE TABLE IF NOT EXISTS events ('
+        'id INTEGER PRIMARY KEY, created REAL NOT NULL, type TEXT NOT NULL, '
+        'user_id INTEGER NOT NULL, channel_id INTEGER NOT NULL, summary TEXT NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS events_user ON events (user_id, created)',
+        'CREATE INDEX IF NOT EXISTS events_channel ON events (channel_id, created)',
+        'CREATE INDEX IF NOT EXISTS events_type ON events (type, created)',
+        'CREATE INDEX IF NOT EXISTS events_created ON events (created)'
+    )
+
+    def __init__(self, path: str = PATH):
+        self.path = path
+        self._connection: sqlite3.Connection | None = None
+        self._lock = Lock()
+        self._pending: list[tuple[float, str, int, int, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            for statement in self._schema:
+                self._connection.execute(statement)
+            self._connection.commit()
+        return self._connection
+
+    def record(self, event_type: str, user_id: int = 0, channel_id: int = 0, summary: str = '') -> None:
+        self._pending.append((time(), event_type, user_id or 0, channel_id or 0, summary[:self.SUMMARY_LIMIT]))
+
+    def _write(self, rows: list[tuple[float, str, int, int, str]]) -> None:
+        with self._lock:
+            connection = self._connect()
+            connection.executemany(
+                'INSERT INTO events (created, type, user_id, channel_id, summary) VALUES (?, ?, ?, ?, ?)', rows)
+            connection.commit()
+
+    async def flush(self) -> int:
+        rows, self._pending = self._pending, []
+        if rows:
+            await asyncio.to_thread(self._write, rows)
+        return len(rows)
+
+    def _purge(self, cutoff: float) -> int:
+        with self._lock:
+            connection = self._connect()
+            deleted = connection.execute('DELETE FROM events WHERE created < ?', (cutoff,)).rowcount
+            connection.commit()
+            return deleted
+
+    async def purge(self, retention: int | float = RETENTION) -> int:
+        return await asyncio.to_thread(self._purge, time() - retention)
+
+    def _search(self, query: str, params: list) -> list[dict]:
+        with self._lock:
+            cursor = self._connect().execute(query, params)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    async def search(self, **kwargs) -> list[dict]:
+        clauses, params = ['created > ?'], [kwargs.get('since', 0)]
+        for column in 'user_id', 'channel_id', 'type':
+            if kwargs.get(column) is not None:
+                clauses.append(f'{column} = ?')
+                params.append(kwargs[column])
+        params.append(kwargs.get('limit', 500))
+
+        # Flush first so that the most recent events are searchable immediately
+        await self.flush()
+        query = f'SELECT * FROM events WHERE {" AND ".join(clauses)} ORDER BY created DESC LIMIT ?'
+        return await asyncio.to_thread(self._search, query, params)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,64 @@
+from array import array
+from typing import Iterator
+
+
+class ColumnBuffer:
+
+    # Column name -> array typecode, subclasses append one value to every column per row
+    COLUMNS: dict[str, str] = {}
+
+    def __init__(self):
+        for name, typecode in self.COLUMNS.items():
+            setattr(self, name, array(typecode))
+
+    def __len__(self) -> int:
+        return len(getattr(self, next(iter(self.COLUMNS))))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in self.columns())
+
+    def columns(self) -> list[array]:
+        return [getattr(self, name) for name in self.COLUMNS]
+
+    def empty(self) -> 'ColumnBuffer':
+        return type(self)()
+
+    def rows(self) -> Iterator[tuple[int | float, ...]]:
+        return zip(*self.columns())
+
+    def documents(self) -> list[dict[str, int | float]]:
+        names = tuple(self.COLUMNS)
+        return [dict(zip(names, row)) for row in self.rows()]
+
+
+class MessageBuffer(ColumnBuffer):
+
+    COLUMNS = {'user_id': 'Q', 'message_id': 'Q', 'channel_id': 'Q', 'created': 'd'}
+
+    user_id: array
+    message_id: array
+    channel_id: array
+    created: array
+
+    def append(self, user_id: int, message_id: int, channel_id: int, created: float) -> None:
+        self.user_id.append(user_id)
+        self.message_id.append(message_id)
+        self.channel_id.append(channel_id)
+        self.created.append(created)
+
+
+class VoiceBuffer(ColumnBuffer):
+
+    COLUMNS = {'user_id': 'Q', 'channel_id': 'Q', 'joined': 'd', 'left': 'd'}
+
+    user_id: array
+    channel_id: array
+    joined: array
+    left: array
+
+    def append(self, user_id: int, channel_id: int, joined: float, left: float) -> None:
+        self.user_id.append(user_id)
+        self.channel_id.append(channel_id)
+        self.joined.append(joined)
+        self.left.append(left)
@@ -0,0 +1,13 @@
+import asyncio
+from typing import Coroutine
+
+
+async def gather_limited(coros: list[Coroutine], limit: int) -> list:
+    # Runs every coroutine with at most `limit` in flight, exceptions are returned in place of results
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _limited(coro: Coroutine):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*(_limited(coro) for coro in coros), return_exceptions=True)
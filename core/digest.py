@@ -0,0 +1,51 @@
+from time import time
+from collections import Counter
+
+
+class LogDigest:
+
+    MAX_USER_ITEMS = 5
+
+    def __init__(self):
+        self.started = time()
+        self._counts: Counter[str] = Counter()
+        self._thresholds: dict[str, int] = {}
+        self._escalated: set[str] = set()
+        self._labels: Counter[str] = Counter()
+        self._users: dict[int, list[str]] = {}
+
+    def __len__(self) -> int:
+        return sum(self._labels.values())
+
+    @property
+    def escalated(self) -> set[str]:
+        return set(self._escalated)
+
+    def add(self, event: str, threshold: int, user_id: int, label: str, detail: str = '') -> bool:
+        # Threshold of 0 always digests, N digests once more than N events arrive within one window, -1 never does
+        self._counts[event] += 1
+        self._thresholds[event] = threshold
+        if threshold < 0:
+            return False
+        elif event not in self._escalated:
+            if self._counts[event] <= threshold:
+                return False
+            self._escalated.add(event)
+
+        self._labels[label] += 1
+        items = self._users.setdefault(user_id, [])
+        if len(items) < self.MAX_USER_ITEMS:
+            items.append(f'{label} {detail}'.strip())
+        return True
+
+    def drain(self) -> tuple[Counter[str], dict[int, list[str]], float]:
+        now = time()
+        labels, users, elapsed = self._labels, self._users, now - self.started
+
+        # Escalated types stay in digest mode until a full window passes under their threshold
+        self._escalated = {event for event in self._escalated
+                           if self._thresholds.get(event, -1) >= 0 and
+                           (self._thresholds[event] == 0 or self._counts[event] > self._thresholds[event])}
+        self._counts.clear()
+        self._labels, self._users, self.started = Counter(), {}, now
+        return labels, users, elapsed
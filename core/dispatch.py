@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from time import time
+from collections import deque
+from typing import Callable, Awaitable
+
+from discord.abc import Messageable
+from discord import HTTPException, Embed
+
+from core.webhooks import WebhookSink
+
+
+class EmbedQueue:
+
+    HIGH, NORMAL, LOW = 0, 1, 2
+    PRIORITY_NAMES = ('high', 'normal', 'low')
+
+    MAX_EMBEDS = 10
+    MAX_LENGTH = 6000
+
+    # Queued embeds allowed per priority before new ones are dropped, high priority embeds are never dropped
+    LIMITS = {NORMAL: 2000, LOW: 500}
+
+    def __init__(self, resolve: Callable[[], Awaitable[Messageable | None]], name: str, sink: WebhookSink = None):
+        self.resolve = resolve
+        self.name = name
+        self.sink = sink
+        self._queues: tuple[deque[tuple[float, Embed]], ...] = (deque(), deque(), deque())
+
+        self.sent = 0
+        self.dropped = [0, 0, 0]
+        self.last_lag = self.max_lag = 0.0
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self._queues)
+
+    def put(self, embed: Embed, priority: int = NORMAL) -> bool:
+        queue = self._queues[priority]
+        limit = self.LIMITS.get(priority)
+        if limit is not None and len(queue) >= limit:
+            self.dropped[priority] += 1
+            return False
+        queue.append((time(), embed))
+        return True
+
+    def _head(self) -> deque[tuple[float, Embed]] | None:
+        return next((queue for queue in self._queues if queue), None)
+
+    def _next_batch(self) -> tuple[list[Embed], float]:
+        queued, embed = self._head().popleft()
+        batch, length, oldest = [embed], len(embed), queued
+
+        while len(batch) < self.MAX_EMBEDS and (queue := self._head()) is not None:
+            if length + len(queue[0][1]) > self.MAX_LENGTH:
+                break
+            queued, embed = queue.popleft()
+            length += len(embed)
+            oldest = min(oldest, queued)
+            batch.append(embed)
+
+        return batch, oldest
+
+    async def flush(self) -> int:
+        if not len(self):
+            return 0
+
+        destination = await self.resolve()
+        if destination is None:
+            # Nothing can be delivered without a channel, but the loss still shows up in the drop counts
+            for priority, queue in enumerate(self._queues):
+                self.dropped[priority] += len(queue)
+                queue.clear()
+            return 0
+
+        batches = []
+        while len(self):
+            batches.append(self._next_batch())
+
+        # With a webhook pool the batches are spread over several rate-limit buckets at once
+        results = await asyncio.gather(*(self._deliver(destination, *batch) for batch in batches))
+        sent = sum(results)
+        self.sent += sent
+        return sent
+
+    async def _deliver(self, destination: Messageable, batch: list[Embed], oldest: float) -> int:
+        try:
+            if self.sink is not None:
+                # noinspection PyTypeChecker
+                await self.sink.send(destination, embeds=batch)
+            else:
+                await destination.send(embeds=batch)
+        except HTTPException as error:
+            logging.error(f'Failed to deliver {len(batch)} queued {self.name} embeds - {error}')
+            return 0
+        finally:
+            self.last_lag = time() - oldest
+            self.max_lag = max(self.max_lag, self.last_lag)
+        return len(batch)
+
+    def metrics(self) -> dict[str, int | float]:
+        metrics = {f'{name}_depth': len(queue) for name, queue in zip(self.PRIORITY_NAMES, self._queues)}
+        metrics |= {f'{name}_dropped': dropped for name, dropped in zip(self.PRIORITY_NAMES, self.dropped)}
+        return metrics | {'sent': self.sent, 'last_lag': self.last_lag, 'max_lag': self.max_lag}
@@ -0,0 +1,64 @@
+from re import compile
+from unicodedata import normalize
+from typing import Any
+
+from core.lru import LRUCache
+
+
+class DuplicateCluster:
+
+    __slots__ = ('first_seen', 'users', 'channels', 'items', 'tripped')
+
+    def __init__(self, now: float):
+        self.first_seen = now
+        self.users: set[int] = set()
+        self.channels: set[int] = set()
+        self.items: list[Any] = []
+        self.tripped = False
+
+
+class DuplicateDetector:
+
+    MAX_ITEMS = 250
+
+    _strip = compile(r'<[@#&!:a-zA-Z0-9_]+>|[^\w]+')
+
+    def __init__(self, channels: int = 3, window: int | float = 60, min_length: int = 16, max_size: int = 5000):
+        self.channels = channels
+        self.window = window
+        self.min_length = min_length
+        self._clusters: LRUCache = LRUCache(max_size)
+
+    def __len__(self) -> int:
+        return len(self._clusters)
+
+    def fingerprint(self, content: str) -> int | None:
+        normalised = self._strip.sub('', normalize('NFKC', content).casefold())
+        if len(normalised) < self.min_length:
+            return
+        return hash(normalised)
+
+    def check(self, content: str, user_id: int, channel_id: int, now: float, item: Any = None) -> list[Any]:
+        key = self.fingerprint(content)
+        if key is None:
+            return []
+
+        cluster = self._clusters.get(key)
+        if cluster is None or cluster.first_seen <= now - self.window:
+            cluster = self._clusters[key] = DuplicateCluster(now)
+
+        cluster.users.add(user_id)
+        cluster.channels.add(channel_id)
+
+        # Once tripped, every further copy within the window is returned alone for the caller to batch
+        if cluster.tripped:
+            return [item]
+        elif len(cluster.items) < self.MAX_ITEMS:
+            cluster.items.append(item)
+
+        if len(cluster.channels) < self.channels:
+            return []
+
+        cluster.tripped = True
+        items, cluster.items = cluster.items, []
+        return items
@@ -1,4 +1,6 @@
-from discord import Embed
+from weakref import ref
+
+from discord import Embed, Color
 
 
 class EmbedField:
@@ -22,3 +24,27 @@ class CustomEmbed(Embed):
             self._fields.reverse()
         except AttributeError:
             pass
+
+
+class EmbedFactory:
+
+    def __init__(self, bot):
+        self._bot = ref(bot)
+        self._avatar: str | None = None
+        self._icon_url: str | None = None
+
+    @property
+    def icon_url(self) -> str:
+        user = self._bot().user
+        avatar = user.avatar
+        # The URL string is only rebuilt when the bot's avatar hash changes
+        key = avatar.key if avatar else None
+        if self._icon_url is None or key != self._avatar:
+            self._avatar = key
+            self._icon_url = str(avatar or user.default_avatar)
+        return self._icon_url
+
+    def build(self, author: str, color: Color, description: str | None = None, cls: type[Embed] = Embed) -> Embed:
+        embed = cls(color=color, description=description)
+        embed.set_author(name=author, icon_url=self.icon_url)
+        return embed
@@ -10,7 +10,9 @@ from discord import (
 class CustomHelpCommand(commands.HelpCommand):
 
     COG_NAME_DICT = {
+        'AntiRaid': 'Anti-Raid Commands',
         'ConfigurationCommands': 'Configuration Commands',
+        'CustomSlowmode': 'Custom Slowmode Commands',
         'InformationCommands': 'Information Commands',
         'MiscellaneousCommands': 'Miscellaneous Commands',
         'ModerationCommands': 'Moderation Commands',
@@ -0,0 +1,79 @@
+from time import time
+from heapq import heappush, heappop
+
+
+class InfractionTracker:
+
+    def __init__(self, decay: int | float = 60):
+        self.decay = decay
+        # user_id -> (count, last), where `last` is the point from which the next decay step is measured
+        self._entries: dict[int, tuple[int, float]] = {}
+        self._expiry: list[tuple[float, int]] = []
+
+    def __len__(self) -> int:
+        self._evict(time())
+        return len(self._entries)
+
+    def __contains__(self, user_id: int) -> bool:
+        return self.get(user_id) > 0
+
+    def _expires_at(self, count: int, last: float) -> float:
+        return last + count * self.decay
+
+    def _evict(self, now: float) -> None:
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, user_id = heappop(self._expiry)
+            entry = self._entries.get(user_id)
+            # Heap entries go stale whenever a user is incremented again, only act on the current one
+            if entry is not None and self._expires_at(*entry) <= now:
+                self._entries.pop(user_id)
+
+    def _decayed(self, user_id: int, now: float) -> tuple[int, float]:
+        count, last = self._entries.get(user_id, (0, now))
+        steps = int((now - last) // self.decay)
+        if steps <= 0:
+            return count, last
+        elif steps >= count:
+            return 0, now
+        return count - steps, last + steps * self.decay
+
+    def get(self, user_id: int) -> int:
+        now = time()
+        self._evict(now)
+        return self._decayed(user_id, now)[0]
+
+    def increment(self, user_id: int) -> int:
+        now = time()
+        self._evict(now)
+
+        count, last = self._decayed(user_id, now)
+        if count < 1:
+            last = now
+        count += 1
+
+        self._entries[user_id] = (count, last)
+        heappush(self._expiry, (self._expires_at(count, last), user_id))
+        return count
+
+    def reset(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+
+    def snapshot(self) -> list[dict]:
+        now = time()
+        self._evict(now)
+        entries = []
+        for user_id in self._entries:
+            count, last = self._decayed(user_id, now)
+            if count > 0:
+                entries.append({'user_id': user_id, 'count': count, 'last': last})
+        return entries
+
+    def load(self, entries: list[dict]) -> None:
+        now = time()
+        for entry in entries:
+            user_id, count, last = entry.get('user_id'), entry.get('count', 0), entry.get('last', now)
+            if not user_id or count < 1:
+                continue
+            self._entries[user_id] = (count, last)
+            heappush(self._expiry, (self._expires_at(count, last), user_id))
+        self._evict(now)
@@ -0,0 +1,111 @@
+from heapq import nlargest
+from operator import itemgetter
+from time import time
+from typing import Iterable
+
+
+def top(totals: dict[int, int | float], k: int) -> list[tuple[int, int | float]]:
+    return nlargest(k, totals.items(), key=itemgetter(1))
+
+
+def rank(totals: dict[int, int | float], key: int, value: int | float | None = None) -> int | None:
+    # `value` ranks a total counted elsewhere against these, otherwise the key's own total is used
+    if value is None:
+        value = totals.get(key)
+        if value is None:
+            return
+    # One counting pass instead of sorting everything to find a single position
+    return 1 + sum(1 for other_key, other in totals.items() if other > value and other_key != key)
+
+
+BUCKET = 3600
+
+
+def new_totals() -> dict[str, dict[int, int | float]]:
+    return {'umc': {}, 'cmc': {}, 'uvt': {}, 'cvt': {}}
+
+
+def bucket_of(timestamp: float) -> int:
+    return int(timestamp // BUCKET * BUCKET)
+
+
+def bucket_totals(messages: Iterable[tuple[int, int, float]],
+                  sessions: Iterable[tuple[int, int, float, float]]) -> dict[int, dict[str, dict[int, int | float]]]:
+    changes: dict[int, dict[str, dict]] = {}
+    for user_id, channel_id, created in messages:
+        totals = changes.get(bucket := bucket_of(created)) or changes.setdefault(bucket, new_totals())
+        totals['umc'][user_id] = totals['umc'].get(user_id, 0) + 1
+        totals['cmc'][channel_id] = totals['cmc'].get(channel_id, 0) + 1
+
+    for user_id, channel_id, joined, left in sessions:
+        # Sessions are split at hour boundaries so every bucket only holds time spent within it
+        while joined < left:
+            bucket = bucket_of(joined)
+            seconds = min(left, bucket + BUCKET) - joined
+            totals = changes.get(bucket) or changes.setdefault(bucket, new_totals())
+            totals['uvt'][user_id] = totals['uvt'].get(user_id, 0) + seconds
+            totals['cvt'][channel_id] = totals['cvt'].get(channel_id, 0) + seconds
+            joined += seconds
+    return changes
+
+
+class LeaderboardCache:
+
+    def __init__(self, lookbacks: tuple[int, ...]):
+        self.lookbacks = lookbacks
+        # Hour start -> totals of that hour, kept for as long as the longest window still covers it
+        self.buckets: dict[int, dict[str, dict[int, int | float]]] = {}
+        self.windows: dict[int, dict[str, dict[int, int | float]]] = {lookback: new_totals() for lookback in lookbacks}
+        self._starts: dict[int, int] = {}
+        self.refreshed = 0.0
+
+    @staticmethod
+    def _merge(totals: dict[str, dict], changes: dict[str, dict], sign: int = 1) -> None:
+        for key, change in changes.items():
+            target = totals[key]
+            for _id, value in change.items():
+                value = target.get(_id, 0) + sign * value
+                # Floating point VC totals never land exactly on zero once a bucket is subtracted again
+                if value > 1e-6:
+                    target[_id] = value
+                else:
+                    target.pop(_id, None)
+
+    def reset(self, now: float) -> None:
+        self.buckets = {}
+        self.windows = {lookback: new_totals() for lookback in self.lookbacks}
+        self._starts = {lookback: bucket_of(now - lookback) for lookback in self.lookbacks}
+
+    def ingest(self, changes: dict[int, dict[str, dict[int, int | float]]], now: float) -> None:
+        if not self._starts:
+            self.reset(now)
+
+        for bucket, totals in changes.items():
+            if bucket < min(self._starts.values()):
+                continue
+            self._merge(self.buckets.setdefault(bucket, new_totals()), totals)
+            for lookback, start in self._starts.items():
+                if bucket >= start:
+                    self._merge(self.windows[lookback], totals)
+
+        self.advance(now)
+
+    def advance(self, now: float) -> None:
+        for lookback, start in self._starts.items():
+            new_start = bucket_of(now - lookback)
+            for bucket in range(start, new_start, BUCKET):
+                if bucket in self.buckets:
+                    self._merge(self.windows[lookback], self.buckets[bucket], -1)
+            self._starts[lookback] = max(start, new_start)
+
+        oldest = min(self._starts.values())
+        for bucket in [bucket for bucket in self.buckets if bucket < oldest]:
+            del self.buckets[bucket]
+        self.refreshed = now
+
+    def nearest(self, lookback: int | float) -> tuple[int, dict[str, dict[int, int | float]]]:
+        # Returns the start of the closest cached window along with its totals, windows are aligned to whole buckets
+        cached = min(self.lookbacks, key=lambda _lookback: abs(_lookback - lookback))
+        if cached not in self._starts:
+            return bucket_of(time() - cached), new_totals()
+        return self._starts[cached], self.windows[cached]
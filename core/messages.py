@@ -0,0 +1,78 @@
+from sys import getsizeof
+from datetime import datetime
+from collections import OrderedDict
+
+from discord.utils import snowflake_time
+from discord import Message
+
+
+class CachedMessage:
+
+    __slots__ = ('id', 'author_id', 'channel_id', 'content', 'attachments')
+
+    def __init__(self, message_id: int, author_id: int, channel_id: int, content: str, attachments: tuple[str, ...]):
+        self.id = message_id
+        self.author_id = author_id
+        self.channel_id = channel_id
+        self.content = content
+        self.attachments = attachments
+
+    @classmethod
+    def from_message(cls, message: Message) -> 'CachedMessage':
+        return cls(message.id, message.author.id, message.channel.id, message.content,
+                   tuple(attachment.url for attachment in message.attachments))
+
+    @property
+    def created_at(self) -> datetime:
+        # Derived from the snowflake rather than stored, it costs nothing per entry
+        return snowflake_time(self.id)
+
+    @property
+    def size(self) -> int:
+        return getsizeof(self) + getsizeof(self.content) + sum(getsizeof(url) for url in self.attachments)
+
+
+class MessageCache:
+
+    # Approximate cost of the ordered dict node and key holding each entry
+    ENTRY_OVERHEAD = 100
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries: OrderedDict[int, tuple[CachedMessage, int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, message_id: int) -> bool:
+        return message_id in self._entries
+
+    def _discard(self, message_id: int) -> CachedMessage | None:
+        entry = self._entries.pop(message_id, None)
+        if entry is None:
+            return
+        self.bytes -= entry[1]
+        return entry[0]
+
+    def put(self, message: CachedMessage) -> None:
+        self._discard(message.id)
+        size = message.size + self.ENTRY_OVERHEAD
+        self._entries[message.id] = (message, size)
+        self.bytes += size
+
+        while self.bytes > self.max_bytes and self._entries:
+            self.bytes -= self._entries.popitem(last=False)[1][1]
+
+    def get(self, message_id: int) -> CachedMessage | None:
+        entry = self._entries.get(message_id)
+        return entry[0] if entry else None
+
+    def edit(self, message_id: int, content: str) -> CachedMessage | None:
+        message = self.get(message_id)
+        if message is not None:
+            self.put(CachedMessage(message.id, message.author_id, message.channel_id, content, message.attachments))
+        return message
+
+    def pop(self, message_id: int) -> CachedMessage | None:
+        return self._discard(message_id)
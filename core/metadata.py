@@ -6,9 +6,18 @@ from discord import HTTPException, Role
 
 class MetaData(dict):
 
+    _ignore_keys = (
+        'event_ignored_roles',
+        'event_ignored_channels',
+        'auto_mod_ignored_roles',
+        'auto_mod_ignored_channels'
+    )
+
     def __init__(self, bot, **kwargs):
         super().__init__(**kwargs)
         self._bot = ref(bot)
+        # Metadata is rebuilt on every update, so membership sets only need computing once per instance
+        self._ignored: dict[str, frozenset[int]] = {key: frozenset(self.get(key, ())) for key in self._ignore_keys}
 
     @property
     def bot(self):
@@ -54,20 +63,24 @@ class MetaData(dict):
         return self.get('suggest_bl', [])
 
     @property
-    def event_ignored_roles(self) -> list[int]:
-        return self.get('event_ignored_roles', [])
+    def event_ignored_roles(self) -> frozenset[int]:
+        return self._ignored['event_ignored_roles']
+
+    @property
+    def event_ignored_channels(self) -> frozenset[int]:
+        return self._ignored['event_ignored_channels']
 
     @property
-    def event_ignored_channels(self) -> list[int]:
-        return self.get('event_ignored_channels', [])
+    def auto_mod_ignored_roles(self) -> frozenset[int]:
+        return self._ignored['auto_mod_ignored_roles']
 
     @property
-    def auto_mod_ignored_roles(self) -> list[int]:
-        return self.get('auto_mod_ignored_roles', [])
+    def auto_mod_ignored_channels(self) -> frozenset[int]:
+        return self._ignored['auto_mod_ignored_channels']
 
     @property
-    def auto_mod_ignored_channels(self) -> list[int]:
-        return self.get('auto_mod_ignored_channels', [])
+    def log_digest(self) -> dict[str, int]:
+        return self.get('log_digest') or {}
 
     @property
     def welcome_msg(self) -> str:
@@ -3,7 +3,7 @@ from time import time
 from typing import Literal, AsyncIterator
 
 from certifi import where
-from pymongo import ReturnDocument, DESCENDING
+from pymongo import ReturnDocument, DESCENDING, ASCENDING, UpdateOne
 from pymongo.errors import (
     ConfigurationError,
     ServerSelectionTimeoutError
@@ -53,14 +53,22 @@ class MongoDBClient:
         'auto_mod_ignored_roles': [],
         'auto_mod_ignored_channels': [],
 
+        'log_digest': {},
+
         'activity': None,
         'welcome_msg': None,
         'appeal_url': None
     }
 
     COMMAND_TYPES = Literal['faq', 'custom']
+    ACTIVITY_TIERS = Literal['hour', 'day', 'month']
     ROLE_TYPES = Literal['persistent', 'custom']
 
+    # Activity tier -> (collection, field holding the start of each bucket)
+    TIER_COLLECTIONS = {'hour': ('activity_buckets', 'hour'),
+                        'day': ('activity_daily', 'day'),
+                        'month': ('activity_monthly', 'month')}
+
     def __init__(self, bot, connection_uri: str):
         self.bot = bot
 
@@ -78,6 +86,7 @@ class MongoDBClient:
         self.database: AsyncIOMotorDatabase = self.client.database
 
         self.__session: AsyncIOMotorClientSession | None = None
+        self.__counter_seeded = False
 
     async def __aenter__(self):
         try:
@@ -109,15 +118,51 @@ class MongoDBClient:
         # Edit `CustomBot.metadata` in-place rather than returning a new version
         self.bot.metadata = MetaData(self.bot, **data)
 
-    async def new_modlog_id(self) -> int:
+    async def _latest_modlog_id(self) -> int:
         modlog = await self.database.modlogs.find_one(sort=[('case_id', DESCENDING)], session=self.__session)
-        return modlog.get('case_id') + 1 if modlog else 1
+        return modlog.get('case_id') if modlog else 0
+
+    async def reserve_modlog_ids(self, count: int = 1) -> int:
+        # Case IDs come from a counter document so concurrent inserts can never be handed the same ID
+        # The counter is seeded once from the newest modlog, `$max` keeps a racing seed from rolling it back
+        if not self.__counter_seeded:
+            await self.database.counters.update_one(
+                {'_id': 'case_id'},
+                {'$max': {'value': await self._latest_modlog_id()}},
+                upsert=True,
+                session=self.__session
+            )
+            self.__counter_seeded = True
+
+        counter = await self.database.counters.find_one_and_update(
+            {'_id': 'case_id'},
+            {'$inc': {'value': count}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+            session=self.__session
+        )
+        return counter.get('value') - count + 1
+
+    async def new_modlog_id(self) -> int:
+        return await self.reserve_modlog_ids()
 
     async def insert_modlog(self, **kwargs) -> ModLogEntry:
         await self.database.modlogs.insert_one(kwargs, session=self.__session)
         logging.info(f'New modlog entry created - Case ID: {kwargs.get("case_id")}')
         return ModLogEntry(self.bot, **kwargs)
 
+    async def insert_modlogs(self, entries: list[dict]) -> list[ModLogEntry]:
+        if not entries:
+            return []
+        # Case IDs are reserved in one block so that a whole batch lands in one round-trip
+        case_id = await self.reserve_modlog_ids(len(entries))
+        for entry in entries:
+            entry['case_id'] = case_id
+            case_id += 1
+        await self.database.modlogs.insert_many(entries, session=self.__session)
+        logging.info(f'{len(entries)} new modlog entries created - Case IDs: {entries[0]["case_id"]}-{case_id - 1}')
+        return [ModLogEntry(self.bot, **entry) for entry in entries]
+
     async def update_modlog(self, **kwargs) -> ModLogEntry:
         # Kwargs with leading underscores are our search parameters
         # Kwargs without leading underscores are our values to update
@@ -153,6 +198,39 @@ class MongoDBClient:
 
         return modlogs
 
+    async def get_infractions(self) -> list[dict]:
+        return [entry async for entry in self.database.infractions.find({}, session=self.__session)]
+
+    async def dump_infractions(self, entries: list[dict]) -> None:
+        await self.database.infractions.delete_many({}, session=self.__session)
+        if entries:
+            await self.database.infractions.insert_many(entries, session=self.__session)
+
+    async def get_slowmode_rules(self) -> list[dict]:
+        return [rule async for rule in self.database.slowmode_rules.find({}, session=self.__session)]
+
+    async def seed_slowmode_rules(self, rules: list[dict]) -> None:
+        # Only a database that has never stored rules is seeded, removing every rule later does not bring them back
+        if 'slowmode_rules' in await self.database.list_collection_names(session=self.__session):
+            return
+        await self.database.slowmode_rules.insert_many(rules, session=self.__session)
+
+    async def update_slowmode_rule(self, **kwargs) -> None:
+        await self.database.slowmode_rules.replace_one(
+            {'channel_id': kwargs.get('channel_id')}, kwargs, upsert=True, session=self.__session)
+
+    async def delete_slowmode_rule(self, channel_id: int) -> None:
+        await self.database.slowmode_rules.delete_one({'channel_id': channel_id}, session=self.__session)
+        await self.database.slowmode_indexes.delete_one({'channel_id': channel_id}, session=self.__session)
+
+    async def get_slowmode_indexes(self) -> list[dict]:
+        return [entry async for entry in self.database.slowmode_indexes.find({}, session=self.__session)]
+
+    async def dump_slowmode_indexes(self, entries: list[dict]) -> None:
+        for entry in entries:
+            await self.database.slowmode_indexes.replace_one(
+                {'channel_id': entry['channel_id']}, entry, upsert=True, session=self.__session)
+
     async def dump_msg_stats(self, entries: list[dict]):
         if not entries:
             return
@@ -171,11 +249,86 @@ class MongoDBClient:
         _m = time() - lookback
         return self.database.vc_stats.find({'joined': {'$gt': _m}}, session=self.__session)
 
+    async def ensure_stats_indexes(self) -> None:
+        for collection, field in (self.database.msg_stats, 'created'), (self.database.vc_stats, 'joined'):
+            await collection.create_index([(field, ASCENDING)], session=self.__session)
+            for key in 'user_id', 'channel_id':
+                await collection.create_index([(key, ASCENDING), (field, ASCENDING)], session=self.__session)
+        for collection, field in self.TIER_COLLECTIONS.values():
+            await self.database[collection].create_index(
+                [('scope', ASCENDING), ('target_id', ASCENDING), (field, ASCENDING)],
+                unique=True, session=self.__session)
+            await self.database[collection].create_index([(field, ASCENDING)], session=self.__session)
+
+    async def get_target_stats(self, key: Literal['user_id', 'channel_id'], target_id: int,
+                               lookback: int | float) -> tuple[int, float]:
+        _m = time() - lookback
+        msg_count = await self.database.msg_stats.count_documents(
+            {key: target_id, 'created': {'$gt': _m}}, session=self.__session)
+        vc_time = [entry async for entry in self.database.vc_stats.aggregate([
+            {'$match': {key: target_id, 'joined': {'$gt': _m}}},
+            {'$group': {'_id': None, 'total': {'$sum': {'$subtract': ['$left', '$joined']}}}}
+        ], session=self.__session)]
+        return msg_count, vc_time[0].get('total', 0) if vc_time else 0
+
     async def purge_old_stats(self, lookback: int | float) -> int:
         _m = time() - lookback
         result_1 = await self.database.msg_stats.delete_many({'created': {'$lt': _m}}, session=self.__session)
         result_2 = await self.database.vc_stats.delete_many({'joined': {'$lt': _m}}, session=self.__session)
-        return result_1.deleted_count + result_2.deleted_count
+        result_3 = await self.database.activity_buckets.delete_many({'hour': {'$lt': _m}}, session=self.__session)
+        return result_1.deleted_count + result_2.deleted_count + result_3.deleted_count
+
+    async def dump_activity_buckets(self, entries: list[dict], replace: bool = False) -> None:
+        if not entries:
+            return
+        # Flushes add to their buckets, a backfill from the raw statistics overwrites them with the full totals
+        operator = '$set' if replace else '$inc'
+        await self.database.activity_buckets.bulk_write([UpdateOne(
+            {'scope': entry['scope'], 'target_id': entry['target_id'], 'hour': entry['hour']},
+            {operator: {'messages': entry['messages'], 'vc_time': entry['vc_time']}},
+            upsert=True
+        ) for entry in entries], ordered=False, session=self.__session)
+
+    async def get_activity_buckets(self, tier: ACTIVITY_TIERS, scope: str, target_id: int,
+                                   start: float, end: float) -> list[dict]:
+        collection, field = self.TIER_COLLECTIONS[tier]
+        return [entry async for entry in self.database[collection].aggregate([
+            {'$match': {'scope': scope, 'target_id': target_id, field: {'$gte': start, '$lt': end}}},
+            {'$project': {'_id': 0, 'start': f'${field}', 'messages': 1, 'vc_time': 1}}
+        ], session=self.__session)]
+
+    async def get_activity_totals(self, tier: ACTIVITY_TIERS, start: float, end: float) -> list[dict]:
+        collection, field = self.TIER_COLLECTIONS[tier]
+        return [entry async for entry in self.database[collection].aggregate([
+            {'$match': {'scope': {'$in': ['user', 'channel']}, field: {'$gte': start, '$lt': end}}},
+            {'$group': {'_id': {'scope': '$scope', 'target_id': '$target_id'},
+                        'messages': {'$sum': '$messages'}, 'vc_time': {'$sum': '$vc_time'}}}
+        ], session=self.__session)]
+
+    async def get_activity_bound(self, tier: ACTIVITY_TIERS, latest: bool = True) -> float | None:
+        collection, field = self.TIER_COLLECTIONS[tier]
+        entry = await self.database[collection].find_one(
+            sort=[(field, DESCENDING if latest else ASCENDING)], session=self.__session)
+        return entry.get(field) if entry else None
+
+    async def compact_activity(self, source: ACTIVITY_TIERS, tier: ACTIVITY_TIERS, start: float, end: float) -> None:
+        source_collection, source_field = self.TIER_COLLECTIONS[source]
+        collection, field = self.TIER_COLLECTIONS[tier]
+        # Each rollup replaces its bucket outright, so compacting the same period twice is harmless
+        await self.database[source_collection].aggregate([
+            {'$match': {source_field: {'$gte': start, '$lt': end}}},
+            {'$group': {'_id': {'scope': '$scope', 'target_id': '$target_id'},
+                        'messages': {'$sum': '$messages'}, 'vc_time': {'$sum': '$vc_time'}}},
+            {'$project': {'_id': 0, 'scope': '$_id.scope', 'target_id': '$_id.target_id',
+                          field: {'$literal': start}, 'messages': 1, 'vc_time': 1}},
+            {'$merge': {'into': collection, 'on': ['scope', 'target_id', field],
+                        'whenMatched': 'replace', 'whenNotMatched': 'insert'}}
+        ], session=self.__session).to_list(length=None)
+
+    async def purge_activity(self, tier: ACTIVITY_TIERS, before: float) -> int:
+        collection, field = self.TIER_COLLECTIONS[tier]
+        result = await self.database[collection].delete_many({field: {'$lt': before}}, session=self.__session)
+        return result.deleted_count
 
     async def fetch_commands(self, command_type: COMMAND_TYPES) -> list[dict]:
         return [cmd async for cmd in self.database[f'{command_type}_commands'].find({}, session=self.__session)]
@@ -0,0 +1,45 @@
+from collections import deque
+
+
+class RaidDetector:
+
+    # Upper bounds (in seconds) of each account-age bucket, anything older falls into the last bucket
+    AGE_BUCKETS = {'< 1 Hour': 3600, '< 1 Day': 86400, '< 1 Week': 604800, '< 1 Month': 2592000, '< 1 Year': 31536000}
+    YOUNG_ACCOUNT_AGE = 604800
+
+    def __init__(self, joins: int = 10, window: int | float = 30, young_ratio: float = 0.5):
+        self.joins = joins
+        self.window = window
+        self.young_ratio = young_ratio
+        self._joins: deque[tuple[float, int, float]] = deque()
+
+    def __len__(self) -> int:
+        return len(self._joins)
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.window
+        while self._joins and self._joins[0][0] <= cutoff:
+            self._joins.popleft()
+
+    def record(self, user_id: int, created: float, now: float) -> bool:
+        self._expire(now)
+        self._joins.append((now, user_id, now - created))
+
+        count = len(self._joins)
+        if count >= self.joins:
+            return True
+        # A smaller burst still trips if most of it is made up of freshly created accounts
+        young = sum(1 for _, _, age in self._joins if age < self.YOUNG_ACCOUNT_AGE)
+        return count >= self.joins // 2 and young / count >= self.young_ratio
+
+    def user_ids(self, now: float) -> list[int]:
+        self._expire(now)
+        return [user_id for _, user_id, _ in self._joins]
+
+    @classmethod
+    def histogram(cls, ages: list[float]) -> dict[str, int]:
+        histogram = {label: 0 for label in cls.AGE_BUCKETS} | {'Older': 0}
+        for age in ages:
+            label = next((label for label, limit in cls.AGE_BUCKETS.items() if age < limit), 'Older')
+            histogram[label] += 1
+        return histogram
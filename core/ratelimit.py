@@ -0,0 +1,39 @@
+from collections import deque
+from typing import Hashable, Any
+
+
+class SlidingWindow:
+
+    PRUNE_INTERVAL = 1000
+
+    def __init__(self, limit: int, window: int | float):
+        self.limit = limit
+        self.window = window
+        # Each key owns a ring buffer of at most `limit` (timestamp, item) pairs, so memory is bounded per key
+        self._buckets: dict[Hashable, deque[tuple[float, Any]]] = {}
+        self._hits = 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def hit(self, key: Hashable, now: float, item: Any = None) -> bool:
+        self._hits += 1
+        if self._hits % self.PRUNE_INTERVAL == 0:
+            self.prune(now)
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = deque(maxlen=self.limit)
+        bucket.append((now, item))
+
+        return len(bucket) == self.limit and bucket[0][0] > now - self.window
+
+    def drain(self, key: Hashable) -> list[Any]:
+        bucket = self._buckets.pop(key, ())
+        return [item for _, item in bucket if item is not None]
+
+    def prune(self, now: float) -> None:
+        cutoff = now - self.window
+        stale = [key for key, bucket in self._buckets.items() if bucket[-1][0] <= cutoff]
+        for key in stale:
+            self._buckets.pop(key)
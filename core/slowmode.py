@@ -0,0 +1,53 @@
+from heapq import heappush, heappop
+
+
+class SlowmodeIndex:
+
+    def __init__(self, cooldown: int | float):
+        self.cooldown = cooldown
+        # user_id -> (posted, message_id) of the post that started the user's current cooldown
+        self._posts: dict[int, tuple[float, int]] = {}
+        self._messages: dict[int, int] = {}
+        self._expiry: list[tuple[float, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._posts)
+
+    def evict(self, now: float) -> None:
+        while self._expiry and self._expiry[0][0] <= now:
+            _, user_id = heappop(self._expiry)
+            post = self._posts.get(user_id)
+            # A later post or a deleted one leaves the old expiry in the heap, so trust only the stored post
+            if post is not None and post[0] + self.cooldown <= now:
+                del self._posts[user_id]
+                self._messages.pop(post[1], None)
+
+    def cooldown_until(self, user_id: int, now: float) -> float | None:
+        post = self._posts.get(user_id)
+        if post is None or post[0] + self.cooldown <= now:
+            return
+        return post[0] + self.cooldown
+
+    def record(self, user_id: int, message_id: int, posted: float) -> None:
+        post = self._posts.get(user_id)
+        if post is not None:
+            if post[0] >= posted:
+                return
+            self._messages.pop(post[1], None)
+
+        self._posts[user_id] = (posted, message_id)
+        self._messages[message_id] = user_id
+        heappush(self._expiry, (posted + self.cooldown, user_id))
+
+    def discard(self, message_id: int) -> None:
+        user_id = self._messages.pop(message_id, None)
+        if user_id is not None:
+            self._posts.pop(user_id, None)
+
+    def snapshot(self) -> list[list[int | float]]:
+        return [[user_id, posted, message_id] for user_id, (posted, message_id) in self._posts.items()]
+
+    def load(self, entries: list[list[int | float]], now: float) -> None:
+        for user_id, posted, message_id in entries:
+            self.record(user_id, message_id, posted)
+        self.evict(now)
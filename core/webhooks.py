@@ -0,0 +1,111 @@
+import asyncio
+import logging
+from time import time
+from weakref import ref
+
+from discord.abc import GuildChannel
+from discord import (
+    HTTPException,
+    NotFound,
+    Webhook,
+    File
+)
+
+
+class WebhookSink:
+
+    NAME = 'YCC Utilities Logs'
+    POOL_SIZE = 3
+    RETRY_POOL_AFTER = 600
+
+    def __init__(self, bot):
+        self._bot = ref(bot)
+        self._pools: dict[int, list[Webhook]] = {}
+        self._cursors: dict[int, int] = {}
+        self._failed: dict[int, float] = {}
+        self._pool_locks: dict[int, asyncio.Lock] = {}
+        # Webhook ID -> lock held for the duration of a send, so concurrent batches spread across the pool
+        self._send_locks: dict[int, asyncio.Lock] = {}
+        self._cooldowns: dict[int, float] = {}
+
+    @property
+    def bot(self):
+        return self._bot()
+
+    def owns(self, webhook_id: int | None) -> bool:
+        return webhook_id is not None and any(hook.id == webhook_id for pool in self._pools.values() for hook in pool)
+
+    def pool_size(self, channel_id: int) -> int:
+        return len(self._pools.get(channel_id, ()))
+
+    async def _pool(self, channel: GuildChannel) -> list[Webhook]:
+        if channel.id in self._pools:
+            return self._pools[channel.id]
+        elif time() - self._failed.get(channel.id, 0) < self.RETRY_POOL_AFTER:
+            return []
+
+        async with self._pool_locks.setdefault(channel.id, asyncio.Lock()):
+            if channel.id in self._pools:
+                return self._pools[channel.id]
+            try:
+                # noinspection PyUnresolvedReferences
+                hooks = [hook for hook in await channel.webhooks()
+                         if hook.name == self.NAME and hook.user and hook.user.id == self.bot.user.id]
+                while len(hooks) < self.POOL_SIZE:
+                    # noinspection PyUnresolvedReferences
+                    hooks.append(await channel.create_webhook(name=self.NAME))
+            except (HTTPException, AttributeError) as error:
+                logging.warning(f'Webhook pool unavailable for {channel.id}, falling back to bot sends - {error}')
+                self._failed[channel.id] = time()
+                return []
+
+            self._pools[channel.id] = hooks[:self.POOL_SIZE]
+            return self._pools[channel.id]
+
+    def _pick(self, channel_id: int, pool: list[Webhook]) -> Webhook | None:
+        now, start = time(), self._cursors.get(channel_id, 0) % len(pool)
+        ready = [hook for hook in pool[start:] + pool[:start] if self._cooldowns.get(hook.id, 0) <= now]
+        if not ready:
+            return
+
+        # Prefer the next idle webhook in rotation, otherwise queue behind the next one that is not cooling down
+        hook = next((hook for hook in ready if not self._send_locks.setdefault(hook.id, asyncio.Lock()).locked()),
+                    ready[0])
+        self._cursors[channel_id] = (pool.index(hook) + 1) % len(pool)
+        return hook
+
+    def _discard(self, channel_id: int, hook: Webhook) -> None:
+        pool = self._pools.get(channel_id, [])
+        if hook in pool:
+            pool.remove(hook)
+        if not pool:
+            self._pools.pop(channel_id, None)
+
+    async def send(self, channel: GuildChannel, **kwargs) -> None:
+        pool = await self._pool(channel)
+        hook = self._pick(channel.id, pool) if pool else None
+
+        if hook is not None:
+            user = self.bot.user
+            try:
+                async with self._send_locks[hook.id]:
+                    # Each webhook has its own bucket, discord.py delays on its rate-limit headers under this lock
+                    await hook.send(username=user.name, avatar_url=(user.avatar or user.default_avatar).url, **kwargs)
+                return
+            except NotFound:
+                self._discard(channel.id, hook)
+            except HTTPException as error:
+                if error.status == 429:
+                    retry_after = float(error.response.headers.get('Retry-After', 1))
+                    self._cooldowns[hook.id] = time() + retry_after
+                logging.warning(f'Webhook send failed in {channel.id}, falling back to bot send - {error}')
+
+            # A failed upload may have read the attachment to its end, the bot send gets a rewound copy
+            file = kwargs.get('file')
+            if file is not None:
+                file.fp.seek(0)
+                kwargs['file'] = File(file.fp, filename=file.filename, spoiler=file.spoiler,
+                                      description=file.description)
+
+        # noinspection PyUnresolvedReferences
+        await channel.send(**kwargs)
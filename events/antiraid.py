@@ -0,0 +1,232 @@
+import logging
+from time import time
+from typing import Literal
+
+from discord.ext import commands, tasks
+from discord.utils import utcnow
+from discord import (
+    HTTPException,
+    Member,
+    Embed,
+    Color
+)
+
+from main import CustomBot
+from core.raid import RaidDetector
+from core.context import CustomContext
+from core.concurrency import gather_limited
+
+
+class AntiRaid(commands.Cog):
+
+    _reason = 'No reason provided.'
+
+    RAID_JOINS = 10
+    RAID_WINDOW = 30
+    RAID_COOLDOWN = 600
+    DIGEST_INTERVAL = 60
+    ACTION_CONCURRENCY = 5
+    BAN_CHUNK = 200
+    BAN_DELETE_SECONDS = 3600
+
+    def __init__(self, bot: CustomBot):
+        self.bot = bot
+        self.detector = RaidDetector(joins=self.RAID_JOINS, window=self.RAID_WINDOW)
+        self.cohort: dict[int, Member] = {}
+        self.pending: list[Member] = []
+        self.last_trip: float = 0
+
+    def cog_load(self) -> None:
+        self.join_digest.add_exception_type(Exception)
+        self.join_digest.start()
+
+    def cog_unload(self) -> None:
+        self.join_digest.cancel()
+        self.join_digest.clear_exception_types()
+
+    @property
+    def avatar(self):
+        return self.bot.user.avatar or self.bot.user.default_avatar
+
+    async def _log(self, embed: Embed) -> None:
+        logger = await self.bot.metadata.get_channel('logging')
+        try:
+            await self.bot.log_sink.send(logger, embed=embed)
+        except (HTTPException, AttributeError) as error:
+            logging.error(f'Failed to log raid event - {error}')
+
+    def _histogram_str(self, members: list[Member]) -> str:
+        now = utcnow()
+        histogram = self.detector.histogram([(now - member.created_at).total_seconds() for member in members])
+        return '\n'.join(f'> **{label}:** `{count:,}`' for label, count in histogram.items())
+
+    @staticmethod
+    def _mentions_str(members: list[Member], limit: int = 1024) -> str:
+        mentions = ''
+        for i, member in enumerate(members):
+            mention = f'{member.mention} '
+            if len(mentions) + len(mention) > limit - 16:
+                return mentions + f'**+{len(members) - i} more**'
+            mentions += mention
+        return mentions or '`None`'
+
+    def _set_raid_mode(self, enabled: bool) -> None:
+        self.bot.raid_mode = enabled
+        if enabled:
+            self.last_trip = time()
+        else:
+            self.cohort.clear()
+            self.pending.clear()
+
+    async def _targets(self) -> list[Member]:
+        return [member for member in self.cohort.values()
+                if self.bot.guild.get_member(member.id) and not await self.bot.member_clearance(member)]
+
+    async def _insert_modlogs(self, ctx: CustomContext, user_ids: list[int], _type: str, **kwargs) -> None:
+        created = round(utcnow().timestamp())
+        await self.bot.mongo_db.insert_modlogs([dict(
+            mod_id=ctx.author.id, user_id=user_id, channel_id=0, type=_type,
+            reason=kwargs.get('reason', self._reason), created=created, duration=kwargs.get('duration', 0),
+            received=False, active=True, deleted=False) for user_id in user_ids])
+
+    @commands.Cog.listener(name='on_member_join')
+    async def detect_raids(self, member: Member) -> None:
+        if member.guild != self.bot.guild or member.bot:
+            return
+
+        now = time()
+        tripped = self.detector.record(member.id, member.created_at.timestamp(), now)
+        if tripped:
+            self.last_trip = now
+
+        if self.bot.raid_mode:
+            self.cohort[member.id] = member
+            self.pending.append(member)
+            return
+        elif not tripped:
+            return
+
+        self._set_raid_mode(True)
+        for user_id in self.detector.user_ids(now):
+            recent = self.bot.guild.get_member(user_id)
+            if recent:
+                self.cohort[user_id] = recent
+
+        members = list(self.cohort.values())
+        raid_embed = Embed(
+            color=Color.red(),
+            description=f'**{len(members)} members joined within {self.RAID_WINDOW}s.** Per-join welcome and log '
+                        f'messages are suppressed in favour of digests. Use `{self.bot.command_prefix}raid-mute` or '
+                        f'`{self.bot.command_prefix}raid-ban` to act on the whole cohort.')
+        raid_embed.set_author(name='Raid Mode Enabled', icon_url=self.avatar)
+        raid_embed.add_field(name='Account Ages:', value=self._histogram_str(members), inline=False)
+        raid_embed.add_field(name='Members:', value=self._mentions_str(members), inline=False)
+        await self._log(raid_embed)
+
+    @tasks.loop(seconds=DIGEST_INTERVAL)
+    async def join_digest(self) -> None:
+        await self.bot.wait_until_ready()
+        if not self.bot.raid_mode:
+            return
+
+        pending, self.pending = self.pending, []
+        if pending:
+            digest_embed = Embed(
+                color=Color.orange(),
+                description=f'**{len(pending)} members joined in the last {self.DIGEST_INTERVAL}s**')
+            digest_embed.set_author(name='Raid Mode - Join Digest', icon_url=self.avatar)
+            digest_embed.set_footer(text=f'Cohort Size: {len(self.cohort)}')
+            digest_embed.add_field(name='Account Ages:', value=self._histogram_str(pending), inline=False)
+            digest_embed.add_field(name='Members:', value=self._mentions_str(pending), inline=False)
+            await self._log(digest_embed)
+
+        if time() - self.last_trip > self.RAID_COOLDOWN:
+            self._set_raid_mode(False)
+            disabled_embed = Embed(
+                color=Color.green(),
+                description=f'*No join floods detected for {self.RAID_COOLDOWN // 60} minutes.*')
+            disabled_embed.set_author(name='Raid Mode Disabled', icon_url=self.avatar)
+            await self._log(disabled_embed)
+
+    @commands.command(
+        name='raidmode',
+        aliases=['raid'],
+        description='Shows the current raid mode status, or manually toggles it `on` or `off`.',
+        extras={'requirement': 4}
+    )
+    async def raidmode(self, ctx: CustomContext, toggle: Literal['on', 'off'] = None):
+        if toggle is not None:
+            self._set_raid_mode(toggle == 'on')
+            return await self.bot.good_embed(ctx, f'*Raid mode turned `{toggle}`.*')
+
+        members = list(self.cohort.values())
+        status_embed = Embed(
+            color=Color.red() if self.bot.raid_mode else Color.green(),
+            description=f'**Raid Mode: `{"on" if self.bot.raid_mode else "off"}`**\n'
+                        f'**Cohort Size: `{len(members):,}`**')
+        status_embed.set_author(name='Raid Mode Status', icon_url=self.avatar)
+        status_embed.add_field(name='Account Ages:', value=self._histogram_str(members), inline=False)
+        await ctx.send(embed=status_embed)
+
+    @commands.command(
+        name='raid-mute',
+        aliases=['raidmute'],
+        description='Times out every member of the current raid cohort and creates their modlog entries.',
+        extras={'requirement': 4}
+    )
+    @commands.bot_has_permissions(moderate_members=True)
+    async def raid_mute(self, ctx: CustomContext, duration: str, *, reason: str = _reason):
+        _time_delta = self.bot.convert_duration(duration)
+        seconds = _time_delta.total_seconds()
+        if not 60 <= seconds <= 2419200:
+            raise Exception('Duration must be between 1 minute and 28 days.')
+
+        async with ctx.typing():
+            members = await self._targets()
+            if not members:
+                raise Exception('The raid cohort is empty.')
+
+            results = await gather_limited(
+                [member.timeout(_time_delta, reason=reason) for member in members], self.ACTION_CONCURRENCY)
+            muted = [member.id for member, result in zip(members, results) if not isinstance(result, Exception)]
+            await self._insert_modlogs(ctx, muted, 'mute', reason=reason, duration=seconds)
+
+            for user_id in muted:
+                self.cohort.pop(user_id, None)
+
+        await self.bot.good_embed(ctx, f'*Muted `{len(muted)}` of `{len(members)}` cohort members:* {reason}')
+
+    @commands.command(
+        name='raid-ban',
+        aliases=['raidban'],
+        description='Permanently bans every member of the current raid cohort, deleting their last hour of messages.',
+        extras={'requirement': 4}
+    )
+    @commands.bot_has_permissions(ban_members=True)
+    async def raid_ban(self, ctx: CustomContext, *, reason: str = _reason):
+        async with ctx.typing():
+            members = await self._targets()
+            if not members:
+                raise Exception('The raid cohort is empty.')
+
+            chunks = [members[i:i + self.BAN_CHUNK] for i in range(0, len(members), self.BAN_CHUNK)]
+            results = await gather_limited([self.bot.guild.bulk_ban(
+                chunk, reason=reason, delete_message_seconds=self.BAN_DELETE_SECONDS) for chunk in chunks],
+                self.ACTION_CONCURRENCY)
+
+            banned = []
+            for result in results:
+                if isinstance(result, Exception):
+                    logging.error(f'Failed to bulk-ban raid cohort - {result}')
+                    continue
+                banned.extend(user.id for user in result.banned)
+            await self._insert_modlogs(ctx, banned, 'ban', reason=reason, duration=self.bot.perm_duration)
+
+            for user_id in banned:
+                self.cohort.pop(user_id, None)
+
+        await self.bot.good_embed(ctx, f'*Banned `{len(banned)}` of `{len(members)}` cohort members:* {reason}')
+
+
+async def setup(bot: CustomBot):
+    await bot.add_cog(AntiRaid(bot))
@@ -1,4 +1,6 @@
+import asyncio
 import logging
+from time import time
 from re import findall
 from urllib.parse import urlparse
 from datetime import timedelta
@@ -7,20 +9,36 @@ from discord.ext import commands, tasks
 from discord.abc import GuildChannel
 from discord.utils import utcnow
 from discord import (
+    RawMessageUpdateEvent,
     HTTPException,
     Thread,
     Message,
     Member,
-    Embed,
     Color
 )
 
 from main import CustomBot
+from core.infractions import InfractionTracker
+from core.ratelimit import SlidingWindow
+from core.duplicates import DuplicateDetector
+from core.dispatch import EmbedQueue
+from core.lru import LRUCache
 
 
 class AutoModerator(commands.Cog):
 
     MUTE_DURATION = 120
+    INFRACTION_DECAY = 60
+    INFRACTION_LIMIT = 5
+
+    # Member clearance -> (messages, seconds), tiers not listed here are exempt from spam detection
+    SPAM_THRESHOLDS = {0: (6, 5), 1: (10, 5)}
+    CHANNEL_SPAM_THRESHOLD = (25, 5)
+    # Identical content posted in this many channels within the window is treated as a raid copypasta
+    DUPLICATE_CHANNELS = 3
+    DUPLICATE_WINDOW = 60
+    LOG_FLUSH_INTERVAL = 2
+    CLEARED_CACHE_SIZE = 10000
 
     TENOR_ROLES = (
         731988919255695432,
@@ -36,44 +54,241 @@ class AutoModerator(commands.Cog):
 
     def __init__(self, bot: CustomBot):
         self.bot = bot
-        self.infraction_map: dict[Member, int] = {}
-
-    def cog_load(self):
-        self.infraction_cooldown.add_exception_type(Exception)
-        self.infraction_cooldown.start()
-
-    def cog_unload(self):
-        self.infraction_cooldown.cancel()
-        self.infraction_cooldown.clear_exception_types()
+        self.infractions = InfractionTracker(decay=self.INFRACTION_DECAY)
+        self.spam_windows = {tier: SlidingWindow(*limits) for tier, limits in self.SPAM_THRESHOLDS.items()}
+        self.channel_window = SlidingWindow(*self.CHANNEL_SPAM_THRESHOLD)
+        self.duplicates = DuplicateDetector(channels=self.DUPLICATE_CHANNELS, window=self.DUPLICATE_WINDOW)
+        self.log_queue = EmbedQueue(
+            lambda: self.bot.metadata.get_channel('automod'), 'auto-mod', sink=self.bot.log_sink)
+        # channel_id -> (channel, authors, removed message count), coalesced into one warning per flush
+        self.pending_warnings: dict[int, tuple[GuildChannel, dict[int, Member], int]] = {}
+        # content fingerprint -> (content, messages) of tripped duplicate clusters awaiting the next flush
+        self.pending_duplicates: dict[int, tuple[str, dict[int, Message]]] = {}
+        self.duplicate_mutes: dict[int, float] = {}
+        # message_id -> content fingerprint of messages that passed moderation
+        self.cleared: LRUCache = LRUCache(self.CLEARED_CACHE_SIZE)
+        self.cleared_metadata = None
+        self.edits_checked = self.edits_skipped = 0
+
+    async def cog_load(self):
+        self.infractions.load(await self.bot.mongo_db.get_infractions())
+        for loop in self.snapshot_infractions, self.flush_logs:
+            loop.add_exception_type(Exception)
+            loop.start()
+
+    async def cog_unload(self):
+        for loop in self.snapshot_infractions, self.flush_logs:
+            loop.cancel()
+            loop.clear_exception_types()
+        try:
+            await self.flush_logs()
+            await self.bot.mongo_db.dump_infractions(self.infractions.snapshot())
+        except Exception as error:
+            logging.error(f'Failed to flush auto-mod state on unload - {error}')
 
-    @tasks.loop(minutes=1)
-    async def infraction_cooldown(self):
-        for member in self.infraction_map:
-            self.infraction_map[member] -= 1
+    @tasks.loop(minutes=5)
+    async def snapshot_infractions(self):
+        await self.bot.mongo_db.dump_infractions(self.infractions.snapshot())
 
-        to_delete = [member for member in self.infraction_map if self.infraction_map[member] < 1]
-        for member in to_delete:
-            self.infraction_map.pop(member)
+    @staticmethod
+    def _parent_channel(message: Message) -> GuildChannel | None:
+        if isinstance(message.channel, GuildChannel):
+            return message.channel
+        elif isinstance(message.channel, Thread):
+            return message.channel.parent
+
+    def _sync_cleared(self) -> None:
+        # Domain lists and ignores live in the metadata, so a new version invalidates every earlier verdict
+        if self.cleared_metadata is not self.bot.metadata:
+            self.cleared.clear()
+            self.cleared_metadata = self.bot.metadata
+
+    def _is_cleared(self, message: Message) -> bool:
+        self._sync_cleared()
+        return self.cleared.get(message.id) == hash(message.content)
+
+    def _clear(self, message: Message) -> None:
+        self._sync_cleared()
+        self.cleared[message.id] = hash(message.content)
+
+    def _warn(self, channel: GuildChannel, author: Member) -> None:
+        _, authors, count = self.pending_warnings.get(channel.id, (channel, {}, 0))
+        authors[author.id] = author
+        self.pending_warnings[channel.id] = (channel, authors, count + 1)
+
+    @staticmethod
+    async def _bulk_delete(messages: list[Message]) -> int:
+        by_channel: dict[int, list[Message]] = {}
+        for message in messages:
+            by_channel.setdefault(message.channel.id, []).append(message)
+
+        deleted = 0
+        for channel_messages in by_channel.values():
+            channel = channel_messages[0].channel
+            for i in range(0, len(channel_messages), 100):
+                chunk = channel_messages[i:i + 100]
+                try:
+                    await channel.delete_messages(chunk)
+                    deleted += len(chunk)
+                except HTTPException as error:
+                    logging.error(f'Failed to bulk-delete {len(chunk)} messages in {channel.id} - {error}')
+        return deleted
+
+    async def _timeout_members(self, members: list[Member], reason: str) -> None:
+        duration = timedelta(seconds=self.MUTE_DURATION)
+        results = await asyncio.gather(*(member.timeout(duration) for member in members), return_exceptions=True)
+
+        timed_out = []
+        for member, result in zip(members, results):
+            if isinstance(result, Exception):
+                logging.error(f'Failed to time out {member} (ID: {member.id}) for auto-mod infractions - {result}')
+            else:
+                timed_out.append(member)
+
+        created = round(utcnow().timestamp())
+        await self.bot.mongo_db.insert_modlogs([dict(
+            mod_id=self.bot.user.id, user_id=member.id, channel_id=0, type='mute', reason=reason, created=created,
+            duration=self.MUTE_DURATION, received=False, active=True, deleted=False) for member in timed_out])
+
+    async def _infract(self, author: Member) -> None:
+        if self.infractions.increment(author.id) % self.INFRACTION_LIMIT:
+            return
+        self.infractions.reset(author.id)
+        await self._timeout_members([author], f'[AUTO] {self.INFRACTION_LIMIT} Auto-Mod infractions.')
+
+    @tasks.loop(seconds=LOG_FLUSH_INTERVAL)
+    async def flush_logs(self):
+        await self._flush_duplicates()
+
+        pending, self.pending_warnings = self.pending_warnings, {}
+        for channel, authors, count in pending.values():
+            mentions = ', '.join(author.mention for author in authors.values())
+            content = f'{mentions}, that link is not allowed.' if count == 1 else \
+                f'*{count} messages from {mentions} removed.*'
+            try:
+                # noinspection PyUnresolvedReferences
+                await channel.send(content, delete_after=5)
+            except HTTPException:
+                pass
+
+        await self.log_queue.flush()
 
     @commands.Cog.listener()
     async def on_message(self, message: Message):
-        await self.moderate_message(message)
+        author = message.author
+        if not message.guild or message.guild.id != self.bot.guild_id or author.bot:
+            return
+
+        channel = self._parent_channel(message)
+        if channel is None:
+            return
+
+        if channel.id not in self.bot.metadata.auto_mod_ignored_channels and \
+                self.bot.metadata.auto_mod_ignored_roles.isdisjoint(role.id for role in author.roles):
+            clearance = await self.bot.member_clearance(author)
+            if await self.moderate_spam(message, channel, clearance):
+                return
+            elif await self.moderate_duplicates(message, channel, clearance):
+                return
+
+        if not await self.moderate_message(message):
+            self._clear(message)
 
     @commands.Cog.listener()
-    async def on_message_edit(self, _, after: Message):
-        await self.moderate_message(after)
+    async def on_raw_message_edit(self, payload: RawMessageUpdateEvent):
+        # The raw event also covers messages that have fallen out of the gateway's message cache
+        after = payload.message
+        if self._is_cleared(after):
+            self.edits_skipped += 1
+            return
 
-    async def moderate_message(self, message: Message):
+        self.edits_checked += 1
+        if not await self.moderate_message(after):
+            self._clear(after)
+
+    async def moderate_spam(self, message: Message, channel: GuildChannel, clearance: int) -> bool:
+        window = self.spam_windows.get(clearance)
+        if window is None:
+            return False
+
+        now = time()
+        burst: dict[int, Message] = {}
+        offenders: dict[int, Member] = {}
+        if window.hit(message.author.id, now, message):
+            burst.update({m.id: m for m in window.drain(message.author.id)})
+            offenders[message.author.id] = message.author
+        # Channel-wide volume only clears the burst, nobody is infracted for traffic they did not cause alone
+        if self.channel_window.hit(channel.id, now, message):
+            burst.update({m.id: m for m in self.channel_window.drain(channel.id)})
+        if not burst:
+            return False
+
+        messages = list(burst.values())
+        authors = {m.author.id: m.author for m in messages}
+        deleted = await self._bulk_delete(messages)
+
+        spam_embed = self.bot.embed_factory.build(
+            'Spam Removed', Color.red(), f'{" ".join(a.mention for a in authors.values())} (In {channel.mention})')
+        spam_embed.set_footer(text=f'User ID(s): {", ".join(str(_id) for _id in authors)}')
+        spam_embed.add_field(name='Messages Deleted:', value=f'**`{deleted}`**', inline=False)
+        self.log_queue.put(spam_embed)
+
+        for member in offenders.values():
+            await self._infract(member)
+        return True
+
+    async def moderate_duplicates(self, message: Message, channel: GuildChannel, clearance: int) -> bool:
+        if clearance > 1 or not message.content:
+            return False
+
+        messages = self.duplicates.check(message.content, message.author.id, channel.id, time(), message)
+        if not messages:
+            return False
+
+        # Copies are collected and acted upon together on the next flush, so a raid costs one batch of requests
+        key = self.duplicates.fingerprint(message.content)
+        content, batch = self.pending_duplicates.get(key, (message.content, {}))
+        batch.update({m.id: m for m in messages})
+        self.pending_duplicates[key] = (content, batch)
+        return True
+
+    async def _flush_duplicates(self) -> None:
+        pending, self.pending_duplicates = self.pending_duplicates, {}
+        if not pending:
+            return
+
+        now = time()
+        self.duplicate_mutes = {user_id: until for user_id, until in self.duplicate_mutes.items() if until > now}
+        to_mute: dict[int, Member] = {}
+        for content, batch in pending.values():
+            messages = list(batch.values())
+            authors = {m.author.id: m.author for m in messages}
+            channels = {m.channel.id: m.channel for m in messages}
+            deleted = await self._bulk_delete(messages)
+            # A timed out member's cached state lags behind, so recent duplicate mutes are remembered here
+            to_mute.update({_id: author for _id, author in authors.items()
+                            if _id not in self.duplicate_mutes and not author.is_timed_out()})
+
+            dupe_embed = self.bot.embed_factory.build(
+                'Duplicates Removed', Color.red(),
+                f'{" ".join(a.mention for a in authors.values())} '
+                f'(In {" ".join(c.mention for c in channels.values())})')
+            dupe_embed.set_footer(text=f'User ID(s): {", ".join(str(_id) for _id in authors)}')
+            dupe_embed.add_field(name='Message Content', value=content[:1024], inline=False)
+            dupe_embed.add_field(name='Messages Deleted:', value=f'**`{deleted}`**', inline=False)
+            self.log_queue.put(dupe_embed)
+
+        self.duplicate_mutes.update({user_id: now + self.MUTE_DURATION for user_id in to_mute})
+        await self._timeout_members(list(to_mute.values()), '[AUTO] Cross-channel duplicate messages.')
+
+    async def moderate_message(self, message: Message) -> bool:
         author = message.author
         if not message.guild or message.guild.id != self.bot.guild_id or author.bot:
-            return
+            return False
 
-        if isinstance(message.channel, GuildChannel):
-            channel = message.channel
-        elif isinstance(message.channel, Thread):
-            channel = message.channel.parent
-        else:
-            return
+        channel = self._parent_channel(message)
+        if channel is None:
+            return False
 
         urls = findall(r'(https?://\S+)', message.content)
         domains = []
@@ -107,7 +322,7 @@ class AutoModerator(commands.Cog):
             domains.append(domain)
 
         if not domains:
-            return
+            return False
 
         blacklisted = [domain for domain in domains if domain in self.bot.metadata.domain_bl]
         whitelisted = [domain for domain in domains if domain in self.bot.metadata.domain_wl]
@@ -116,60 +331,31 @@ class AutoModerator(commands.Cog):
         keyword = next(a for a in (blacklisted or not_whitelisted or whitelisted))
 
         if await self.bot.member_clearance(author) > 1:
-            return
+            return False
         elif blacklisted:
             pass
-        elif [role for role in author.roles if role.id in self.bot.metadata.auto_mod_ignored_roles]:
-            return
+        elif not self.bot.metadata.auto_mod_ignored_roles.isdisjoint(role.id for role in author.roles):
+            return False
         elif not not_whitelisted and channel.id in self.bot.metadata.auto_mod_ignored_channels:
-            return
+            return False
 
         try:
             await message.delete()
         except HTTPException as error:
             logging.error(f'Failed to moderate message (ID: {message.id}) - {error}')
-            return
+            return True
 
-        try:
-            await channel.send(f'{author.mention}, that link is not allowed.', delete_after=5)
-        except HTTPException:
-            pass
+        self._warn(channel, author)
 
-        msg_embed = Embed(color=Color.red(), description=f'{author.mention} (In {channel.mention})')
-        msg_embed.set_author(icon_url=self.bot.user.avatar or self.bot.user.default_avatar, name='Message Deleted')
+        msg_embed = self.bot.embed_factory.build('Message Deleted', Color.red(), f'{author.mention} (In {channel.mention})')
         msg_embed.set_thumbnail(url=author.avatar or author.default_avatar)
         msg_embed.set_footer(text=f'User ID: {author.id}')
         msg_embed.add_field(name='Message Content', value=message.content, inline=False)
         msg_embed.add_field(name='Keyword:', value=f'**`{keyword}`**', inline=False)
+        self.log_queue.put(msg_embed)
 
-        try:
-            automod_log_channel = await self.bot.metadata.get_channel('automod')
-            if not automod_log_channel:
-                return
-            # noinspection PyUnresolvedReferences
-            await automod_log_channel.send(embed=msg_embed)
-        except HTTPException as error:
-            logging.error(f'Failed to log auto-moderation - {error}')
-
-        try:
-            self.infraction_map[author] += 1
-        except KeyError:
-            self.infraction_map[author] = 1
-
-        if self.infraction_map[author] % 5:
-            return
-        self.infraction_map.pop(author)
-
-        try:
-            await author.timeout(timedelta(seconds=self.MUTE_DURATION))
-        except HTTPException as error:
-            logging.error(f'Failed to time out {author} (ID: {author.id}) for auto-mod infractions - {error}')
-            return
-
-        await self.bot.mongo_db.insert_modlog(
-            case_id=await self.bot.mongo_db.new_modlog_id(), mod_id=self.bot.user.id, user_id=author.id,
-            type='mute', reason='[AUTO] 5 Auto-Mod infractions.', created=round(utcnow().timestamp()),
-            duration=self.MUTE_DURATION, received=False, active=True, deleted=False)
+        await self._infract(author)
+        return True
 
 
 async def setup(bot: CustomBot):
@@ -1,44 +1,220 @@
-from datetime import timedelta
+import logging
+from time import time
+from datetime import timedelta, datetime, timezone
 
-from discord.ext import commands
-from discord.utils import utcnow, format_dt
-from discord import Message
+from discord.ext import commands, tasks
+from discord.utils import format_dt
+from discord.abc import GuildChannel
+from discord import (
+    RawBulkMessageDeleteEvent,
+    RawMessageDeleteEvent,
+    Message,
+    Embed,
+    TextChannel,
+    Color,
+    Role
+)
 
 from main import CustomBot
+from core.slowmode import SlowmodeIndex
+from core.context import CustomContext
+
+
+class SlowmodeRule:
+
+    __slots__ = ('channel_id', 'cooldown', 'exempt_roles', 'index')
+
+    def __init__(self, channel_id: int, cooldown: int | float, exempt_roles: list[int] = None):
+        self.channel_id = channel_id
+        self.cooldown = cooldown
+        self.exempt_roles: frozenset[int] = frozenset(exempt_roles or ())
+        self.index = SlowmodeIndex(cooldown)
+
+    def to_dict(self) -> dict:
+        return {'channel_id': self.channel_id, 'cooldown': self.cooldown, 'exempt_roles': list(self.exempt_roles)}
 
 
 class CustomSlowmode(commands.Cog):
 
+    SNAPSHOT_INTERVAL = 5
+    MIN_COOLDOWN = 60
+    MAX_COOLDOWN = 2419200
+    # The rule that was hard-coded before rules were stored in the database
+    DEFAULT_RULES = [{'channel_id': 1039886236602601512, 'cooldown': 86400, 'exempt_roles': []}]
+
     def __init__(self, bot: CustomBot) -> None:
         self.bot: CustomBot = bot
 
-        self.channels: dict[int, timedelta] = {
-            1039886236602601512: timedelta(seconds=86400)
-        }
+        # channel_id -> rule, replaced wholesale on every change so a message never sees a half-updated table
+        self.rules: dict[int, SlowmodeRule] = {}
+        self.saved: dict[int, float] = {}
+        self.warmed: set[int] = set()
+
+    async def cog_load(self) -> None:
+        await self.bot.mongo_db.seed_slowmode_rules([rule.copy() for rule in self.DEFAULT_RULES])
+        self.rules = {rule['channel_id']: SlowmodeRule(rule['channel_id'], rule['cooldown'], rule.get('exempt_roles'))
+                      for rule in await self.bot.mongo_db.get_slowmode_rules()}
+
+        now = time()
+        for entry in await self.bot.mongo_db.get_slowmode_indexes():
+            rule = self.rules.get(entry.get('channel_id'))
+            if rule is not None:
+                rule.index.load(entry.get('entries', []), now)
+                self.saved[rule.channel_id] = entry.get('saved', 0)
+
+        for loop in self.warm_indexes, self.snapshot_indexes:
+            loop.add_exception_type(Exception)
+            loop.start()
+
+    async def cog_unload(self) -> None:
+        for loop in self.warm_indexes, self.snapshot_indexes:
+            loop.cancel()
+            loop.clear_exception_types()
+        try:
+            await self.snapshot_indexes()
+        except Exception as error:
+            logging.error(f'Failed to save slowmode indexes on unload - {error}')
+
+    async def _warm(self, rule: SlowmodeRule) -> None:
+        channel = self.bot.get_channel(rule.channel_id)
+        if channel is None:
+            return
+
+        # Only messages sent while the bot was offline need reading if the index was saved recently
+        now = time()
+        after = datetime.fromtimestamp(max(now - rule.cooldown, self.saved.get(rule.channel_id, 0)), tz=timezone.utc)
+        try:
+            async for message in channel.history(limit=None, after=after):
+                if not message.author.bot:
+                    rule.index.record(message.author.id, message.id, message.created_at.timestamp())
+        # A failed warm-up must neither abort the remaining rules nor a command that already saved its rule
+        except Exception as error:
+            logging.error(f'Failed to warm slowmode index for {rule.channel_id} - {error}')
+        rule.index.evict(now)
+        self.warmed.add(rule.channel_id)
+
+    @tasks.loop(count=1)
+    async def warm_indexes(self) -> None:
+        await self.bot.wait_until_ready()
+        for rule in list(self.rules.values()):
+            await self._warm(rule)
+
+    @tasks.loop(minutes=SNAPSHOT_INTERVAL)
+    async def snapshot_indexes(self) -> None:
+        now = time()
+        entries = []
+        for channel_id, rule in self.rules.items():
+            # A partially warmed index must not overwrite the last complete one
+            if channel_id not in self.warmed:
+                continue
+            rule.index.evict(now)
+            entries.append({'channel_id': channel_id, 'saved': now, 'entries': rule.index.snapshot()})
+        await self.bot.mongo_db.dump_slowmode_indexes(entries)
 
     @commands.Cog.listener(name="on_message")
     async def enforce_slowmode(self, message: Message) -> None:
         channel, author = message.channel, message.author
 
-        if channel.id not in self.channels:
+        rule = self.rules.get(channel.id)
+        if rule is None:
             return
         elif author.bot:
             return
+        elif rule.exempt_roles and not rule.exempt_roles.isdisjoint(role.id for role in getattr(author, 'roles', ())):
+            return
+
+        now = message.created_at.timestamp()
+        rule.index.evict(now)
+        until = rule.index.cooldown_until(author.id, now)
+        if until is None:
+            rule.index.record(author.id, message.id, now)
+            return
+        # Clearance is only resolved for the few messages that would otherwise be removed
         elif await self.bot.member_clearance(author) > 0:
             return
 
-        cooldown = self.channels[channel.id]
+        await message.delete()
+        await channel.send(
+            f'*{author.mention}, you are on cooldown until '
+            f'{format_dt(datetime.fromtimestamp(until, tz=timezone.utc))}!*',
+            delete_after=5
+        )
 
-        async for old_message in channel.history(limit=None, after=utcnow() - cooldown):
-            if old_message == message:
-                continue
-            elif message.author == old_message.author:
-                await message.delete()
-                await channel.send(
-                    f'*{author.mention}, you are on cooldown until {format_dt(old_message.created_at + cooldown)}!*',
-                    delete_after=5
-                )
-                break
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: RawMessageDeleteEvent) -> None:
+        rule = self.rules.get(payload.channel_id)
+        if rule is not None:
+            rule.index.discard(payload.message_id)
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: RawBulkMessageDeleteEvent) -> None:
+        rule = self.rules.get(payload.channel_id)
+        if rule is not None:
+            for message_id in payload.message_ids:
+                rule.index.discard(message_id)
+
+    @commands.command(
+        name='customslowmode-add',
+        aliases=['csm-add'],
+        description='Limits members to one message per cooldown in a channel, for cooldowns longer than Discord '
+                    'allows. Members with any of the listed roles, and staff, are exempt.',
+        extras={'requirement': 4}
+    )
+    async def customslowmode_add(
+            self, ctx: CustomContext, channel: TextChannel, duration: str, exempt_roles: commands.Greedy[Role]):
+        cooldown = self.bot.convert_duration(duration).total_seconds()
+        if not self.MIN_COOLDOWN <= cooldown <= self.MAX_COOLDOWN:
+            raise Exception('Cooldown must be between 1 minute and 28 days.')
+
+        rule = SlowmodeRule(channel.id, cooldown, [role.id for role in exempt_roles])
+        async with ctx.typing():
+            await self.bot.mongo_db.update_slowmode_rule(**rule.to_dict())
+            self.saved.pop(channel.id, None)
+            self.warmed.discard(channel.id)
+            await self._warm(rule)
+
+        self.rules = self.rules | {channel.id: rule}
+        await self.bot.good_embed(
+            ctx, f'*Set a custom slowmode of `{timedelta(seconds=cooldown)}` in {channel.mention} '
+                 f'(`{len(rule.index)}` members currently on cooldown).*')
+
+    @commands.command(
+        name='customslowmode-remove',
+        aliases=['csm-remove'],
+        description='Removes the custom slowmode from a channel.',
+        extras={'requirement': 4}
+    )
+    async def customslowmode_remove(self, ctx: CustomContext, channel: GuildChannel):
+        if channel.id not in self.rules:
+            raise Exception(f'{channel.mention} does not have a custom slowmode.')
+
+        await self.bot.mongo_db.delete_slowmode_rule(channel.id)
+        self.rules = {channel_id: rule for channel_id, rule in self.rules.items() if channel_id != channel.id}
+        self.saved.pop(channel.id, None)
+        self.warmed.discard(channel.id)
+        await self.bot.good_embed(ctx, f'*Removed the custom slowmode from {channel.mention}.*')
+
+    @commands.command(
+        name='customslowmode-list',
+        aliases=['csm-list', 'csm'],
+        description='Lists every channel with a custom slowmode.',
+        extras={'requirement': 3}
+    )
+    async def customslowmode_list(self, ctx: CustomContext):
+        if not self.rules:
+            raise Exception('No custom slowmodes are set.')
+
+        avatar = self.bot.user.avatar or self.bot.user.default_avatar
+        rules_embed = Embed(color=Color.blue(), description=f'**{len(self.rules)} Custom Slowmode(s)**')
+        rules_embed.set_author(name='Custom Slowmodes', icon_url=avatar)
+        for channel_id, rule in list(self.rules.items())[:25]:
+            rules_embed.add_field(
+                name=f'#{getattr(self.bot.get_channel(channel_id), "name", channel_id)}',
+                value=f'**Cooldown: `{timedelta(seconds=rule.cooldown)}`**\n'
+                      f'**On Cooldown: `{len(rule.index)}`**\n'
+                      f'**Exempt:** {" ".join(f"<@&{role_id}>" for role_id in rule.exempt_roles) or "`None`"}',
+                inline=False)
+        await ctx.send(embed=rules_embed)
 
 
 async def setup(bot: CustomBot) -> None:
@@ -1,9 +1,14 @@
 import logging
+from collections import Counter
+from tempfile import SpooledTemporaryFile
 
-from discord.ext import commands
-from discord.utils import format_dt
+from discord.ext import commands, tasks
+from discord.utils import format_dt, utcnow
 from discord.abc import GuildChannel
 from discord import (
+    RawBulkMessageDeleteEvent,
+    RawMessageDeleteEvent,
+    RawMessageUpdateEvent,
     HTTPException,
     VoiceState,
     Member,
@@ -13,18 +18,82 @@ from discord import (
     Message,
     Guild,
     Role,
-    Asset
+    File
 )
 
 from main import CustomBot
 from core.embed import EmbedField
+from core.dispatch import EmbedQueue
+from core.digest import LogDigest
+from core.messages import CachedMessage, MessageCache
 from components.paginator import UnAuthoredPaginator
 
 
 class EventLogger(commands.Cog):
 
+    FLUSH_INTERVAL = 2
+    # Purges larger than this are logged as a summary embed with a text transcript instead of paginated embeds
+    BULK_TRANSCRIPT_THRESHOLD = 25
+    TRANSCRIPT_SPOOL_SIZE = 1048576
+    MESSAGE_CACHE_BYTES = 33554432
+    EDIT_RECENCY = 60
+
+    DIGEST_WINDOW = 60
+    # Events per window before a type escalates to digest mode, overridden per type by the `log_digest` metadata
+    DIGEST_THRESHOLDS = {'voice_update': 20, 'member_join': 20, 'member_remove': 20, 'member_update': 30}
+
     def __init__(self, bot: CustomBot):
         self.bot = bot
+        self.dispatcher = EmbedQueue(self._log_channel, 'event log', sink=self.bot.log_sink)
+        self.messages = MessageCache(self.MESSAGE_CACHE_BYTES)
+        self.digest = LogDigest()
+
+    def cog_load(self):
+        for loop in self.flush_logs, self.purge_archive, self.flush_digest:
+            loop.add_exception_type(Exception)
+            loop.start()
+
+    async def cog_unload(self):
+        for loop in self.flush_logs, self.purge_archive, self.flush_digest:
+            loop.cancel()
+            loop.clear_exception_types()
+        try:
+            await self.flush_logs()
+        except Exception as error:
+            logging.error(f'Failed to flush event logs on unload - {error}')
+
+    @tasks.loop(seconds=FLUSH_INTERVAL)
+    async def flush_logs(self):
+        await self.dispatcher.flush()
+        await self.bot.archive.flush()
+
+    @tasks.loop(seconds=DIGEST_WINDOW)
+    async def flush_digest(self):
+        labels, users, elapsed = self.digest.drain()
+        if not labels:
+            return
+
+        summary = ', '.join(f'{count:,} {label}' for label, count in labels.most_common())
+        digest_embed = self.bot.embed_factory.build(
+            'Event Digest', Color.blurple(),
+            f'**{summary} in the last {round(elapsed)}s**')
+        digest_embed.set_footer(text=f'Digest Mode: {", ".join(sorted(self.digest.escalated)) or "None"}')
+
+        lines = ''
+        for i, (user_id, items) in enumerate(users.items()):
+            line = f'<@{user_id}> {" | ".join(items)}\n'
+            if len(lines) + len(line) > 1008:
+                lines += f'**+{len(users) - i} more**'
+                break
+            lines += line
+        digest_embed.add_field(name='Members:', value=lines, inline=False)
+
+        self.dispatcher.put(digest_embed, EmbedQueue.NORMAL)
+
+    @tasks.loop(hours=1)
+    async def purge_archive(self):
+        deleted = await self.bot.archive.purge()
+        logging.info(f'Purged {deleted} archived log events.')
 
     async def _log_channel(self) -> GuildChannel | None:
         return await self.bot.metadata.get_channel('logging')
@@ -37,134 +106,210 @@ class EventLogger(commands.Cog):
         except (HTTPException, AttributeError) as error:
             logging.error(f'Failed to log event {event} - {error}')
 
-    @property
-    def avatar(self) -> Asset:
-        return self.bot.user.avatar or self.bot.user.default_avatar
+    def _log(self, embed: Embed, priority: int, event: str, user_id: int = 0, channel_id: int = 0) -> None:
+        threshold = self.bot.metadata.log_digest.get(event, self.DIGEST_THRESHOLDS.get(event, -1))
+        detail = embed.fields[0].value if embed.fields else ''
+        if priority == EmbedQueue.HIGH or not self.digest.add(event, threshold, user_id, embed.author.name, detail):
+            self.dispatcher.put(embed, priority)
 
-    @property
-    def ignored_channels(self) -> list[int]:
-        return self.bot.metadata.event_ignored_channels
+        summary = [embed.author.name] + [f'{field.name} {field.value}' for field in embed.fields] + [embed.footer.text]
+        self.bot.archive.record(event, user_id, channel_id, ' | '.join(part for part in summary if part))
 
     @property
-    def ignored_roles(self) -> list[int]:
-        return self.bot.metadata.event_ignored_roles
+    def avatar(self) -> str:
+        return self.bot.embed_factory.icon_url
+
+    def _ignored(self, guild: Guild | None, channel_id: int = 0, *roles: list[Role]) -> bool:
+        metadata = self.bot.metadata
+        # Runs before any channel resolution or embed construction, the log channel itself is resolved on flush
+        if not metadata.get('logging_channel') or not guild or guild.id != self.bot.guild_id:
+            return True
+        elif channel_id in metadata.event_ignored_channels:
+            return True
+        ignored_roles = metadata.event_ignored_roles
+        return bool(ignored_roles) and any(role.id in ignored_roles for _roles in roles for role in _roles)
+
+    def _member_roles(self, user_id: int) -> list[Role]:
+        member = self.bot.guild.get_member(user_id)
+        return member.roles if member else []
+
+    def _cacheable(self, message: Message) -> bool:
+        # Log entries are posted through our own webhooks and must never be logged themselves
+        return message.guild is not None and message.guild.id == self.bot.guild_id and \
+            message.author != self.bot.user and not self.bot.log_sink.owns(message.webhook_id)
+
+    def _pop_cached(self, message_id: int, cached_message: Message | None) -> CachedMessage | None:
+        message = self.messages.pop(message_id)
+        if message is None and cached_message is not None and self._cacheable(cached_message):
+            message = CachedMessage.from_message(cached_message)
+        return message
+
+    def _recently_edited(self, message: Message) -> bool:
+        return message.edited_at is not None and (utcnow() - message.edited_at).total_seconds() < self.EDIT_RECENCY
+
+    @commands.Cog.listener(name='on_message')
+    async def cache_message(self, message: Message):
+        if self._cacheable(message):
+            self.messages.put(CachedMessage.from_message(message))
 
     @commands.Cog.listener()
-    async def on_message_edit(self, before: Message, after: Message):
-        logger = await self._log_channel()
-        if not logger:
-            return
-        elif not before.guild or before.guild.id != self.bot.guild_id or \
-                before.author == self.bot.user or before.content == after.content:
+    async def on_raw_message_edit(self, payload: RawMessageUpdateEvent):
+        content = payload.data.get('content')
+        author_id = int(payload.data.get('author', {}).get('id', 0))
+        if content is None or not author_id or not self._cacheable(payload.message):
+            return
+
+        before = self.messages.get(payload.message_id)
+        if before is None:
+            # Messages neither cache holds are kept from now on, so their later edits and deletes are logged too
+            self.messages.put(CachedMessage.from_message(payload.message))
+            if payload.cached_message is not None:
+                before = CachedMessage.from_message(payload.cached_message)
+            # Pins and embed unfurls also arrive as updates, only a fresh edit timestamp marks a content change
+            elif not self._recently_edited(payload.message):
+                return
+        else:
+            self.messages.edit(payload.message_id, content)
+
+        if before is not None and before.content == content:
             return
-        elif before.channel.id in self.ignored_channels or \
-                [role for role in before.author.roles if role.id in self.ignored_roles]:
+
+        if self._ignored(self.bot.get_guild(payload.guild_id or 0), payload.channel_id, self._member_roles(author_id)):
             return
 
-        edited_msg_embed = Embed(
-            color=Color.blue(),
-            description=f'{before.author.mention} **([Jump to Message]({before.jump_url}))**')
-        edited_msg_embed.set_author(name='Message Edited', icon_url=self.avatar)
-        edited_msg_embed.set_thumbnail(url=before.author.avatar or before.author.default_avatar)
-        edited_msg_embed.set_footer(text=f'User ID: {before.author.id}')
+        author = self.bot.guild.get_member(author_id)
+        jump_url = f'https://discord.com/channels/{payload.guild_id}/{payload.channel_id}/{payload.message_id}'
+        edited_msg_embed = self.bot.embed_factory.build(
+            'Message Edited', Color.blue(),
+            f'<@{author_id}> **([Jump to Message]({jump_url}))**')
+        if author:
+            edited_msg_embed.set_thumbnail(url=author.avatar or author.default_avatar)
+        edited_msg_embed.set_footer(text=f'User ID: {author_id}')
 
-        edited_msg_embed.add_field(name='Message Content Before:', value=before.content or '`None`', inline=False)
-        edited_msg_embed.add_field(name='Message Content After:', value=after.content or '`None`', inline=False)
+        edited_msg_embed.add_field(
+            name='Message Content Before:',
+            value=(before.content or '`None`') if before else '`Not Cached`',
+            inline=False)
+        edited_msg_embed.add_field(name='Message Content After:', value=content or '`None`', inline=False)
 
-        await self._try_send(logger, edited_msg_embed, 'on_message_edit')
+        self._log(edited_msg_embed, EmbedQueue.NORMAL, 'message_edit', author_id, payload.channel_id)
 
     @commands.Cog.listener()
-    async def on_message_delete(self, message: Message):
-        logger = await self._log_channel()
-        if not logger:
+    async def on_raw_message_delete(self, payload: RawMessageDeleteEvent):
+        message = self._pop_cached(payload.message_id, payload.cached_message)
+        if message is None:
             return
-        elif not message.guild or message.guild.id != self.bot.guild_id or message.author == self.bot.user:
-            return
-        elif message.channel.id in self.ignored_channels or \
-                [role for role in message.author.roles if role.id in self.ignored_roles]:
+        elif self._ignored(
+                self.bot.get_guild(payload.guild_id or 0), message.channel_id, self._member_roles(message.author_id)):
             return
 
-        deleted_msg_embed = Embed(
-            color=Color.red(),
-            description=f'{message.author.mention} (In {message.channel.mention})')
-        deleted_msg_embed.set_author(name='Message Deleted', icon_url=self.avatar)
-        deleted_msg_embed.set_thumbnail(url=message.author.avatar or message.author.default_avatar)
-        deleted_msg_embed.set_footer(text=f'User ID: {message.author.id}')
+        author = self.bot.guild.get_member(message.author_id)
+        deleted_msg_embed = self.bot.embed_factory.build(
+            'Message Deleted', Color.red(),
+            f'<@{message.author_id}> (In <#{message.channel_id}>)')
+        if author:
+            deleted_msg_embed.set_thumbnail(url=author.avatar or author.default_avatar)
+        deleted_msg_embed.set_footer(text=f'User ID: {message.author_id}')
 
         deleted_msg_embed.add_field(name='Message Content:', value=message.content or '`None`', inline=False)
+        if message.attachments:
+            deleted_msg_embed.add_field(name='Attachments:', value='\n'.join(message.attachments)[:1024], inline=False)
         deleted_msg_embed.add_field(name='Message Sent At:', value=f'**{format_dt(message.created_at, "F")}**')
 
-        await self._try_send(logger, deleted_msg_embed, 'on_message_delete')
+        self._log(deleted_msg_embed, EmbedQueue.HIGH, 'message_delete', message.author_id, message.channel_id)
+
+    async def _send_transcript(self, logger: GuildChannel, channel_id: int, messages: list[CachedMessage]) -> None:
+        authors = Counter()
+        transcript = SpooledTemporaryFile(max_size=self.TRANSCRIPT_SPOOL_SIZE)
+        for message in messages:
+            authors[message.author_id] += 1
+            author = self.bot.get_user(message.author_id) or 'Unknown User'
+            content = (message.content or '').replace('\n', '\n    ')
+            attachments = ''.join(f' [{url}]' for url in message.attachments)
+            transcript.write(f'[{message.created_at:%Y-%m-%d %H:%M:%S}] {author} ({message.author_id}): '
+                             f'{content}{attachments}\n'.encode())
+        transcript.seek(0)
+
+        summary_embed = self.bot.embed_factory.build(
+            'Bulk Message Deletion', Color.red(),
+            f'**{len(messages)} Messages Deleted (In <#{channel_id}>)**\n*Full transcript attached.*')
+        summary_embed.add_field(
+            name=f'Authors ({len(authors)}):',
+            value=' '.join(f'<@{user_id}> `{count}`' for user_id, count in authors.most_common(20)),
+            inline=False)
+
+        try:
+            # noinspection PyTypeChecker
+            await self.bot.log_sink.send(
+                logger, embed=summary_embed, file=File(transcript, filename=f'bulk-delete-{channel_id}.txt'))
+        except HTTPException as error:
+            logging.error(f'Failed to log event on_raw_bulk_message_delete - {error}')
+        finally:
+            transcript.close()
 
     @commands.Cog.listener()
-    async def on_bulk_message_delete(self, payload: list[Message]):
-        logger = await self._log_channel()
-        if not logger:
-            return
-        elif not payload or not payload[0].guild or payload[0].guild.id != self.bot.guild_id:
-            return
-        elif payload[0].channel.id in self.ignored_channels:
+    async def on_raw_bulk_message_delete(self, payload: RawBulkMessageDeleteEvent):
+        cached = {message.id: message for message in payload.cached_messages}
+        found = [self._pop_cached(message_id, cached.get(message_id)) for message_id in sorted(payload.message_ids)]
+        if self._ignored(self.bot.get_guild(payload.guild_id or 0), payload.channel_id):
             return
 
-        for message in payload:
-            if [role for role in message.author.roles if role.id in self.ignored_roles]:
-                payload.remove(message)
+        channel_id, ignored_roles, messages = payload.channel_id, self.bot.metadata.event_ignored_roles, []
+        for message in found:
+            if message is None or message.author_id == self.bot.user.id:
+                continue
+            elif ignored_roles and not ignored_roles.isdisjoint(
+                    role.id for role in self._member_roles(message.author_id)):
+                continue
+            messages.append(message)
+            self.bot.archive.record('message_delete', message.author_id, channel_id, message.content)
 
-        if not payload:
+        if not messages:
             return
+        logger = await self._log_channel()
+        if not logger:
+            return
+        elif len(messages) > self.BULK_TRANSCRIPT_THRESHOLD:
+            return await self._send_transcript(logger, channel_id, messages)
 
         fields = [EmbedField(
-            name=f'Message {payload.index(message) + 1}',
-            text=f'**Sent by {message.author.mention} at {format_dt(message.created_at, "F")}**\n'
+            name=f'Message {i}',
+            text=f'**Sent by <@{message.author_id}> at {format_dt(message.created_at, "F")}**\n'
                  f'{message.content or "`None`"}',
             inline=False)
-            for message in payload]
+            for i, message in enumerate(messages, 1)]
         embeds = self.bot.fields_to_embeds(
             fields,
             color=Color.red(),
-            description=f'**{len(payload)} Messages Deleted (In {payload[0].channel.mention})**',
+            description=f'**{len(messages)} Messages Deleted (In <#{channel_id}>)**',
             author_name='Bulk Message Deletion',
             author_icon=self.avatar)
 
-        log_message = await self._try_send(logger, embeds[0], 'on_bulk_message_delete')
+        log_message = await self._try_send(logger, embeds[0], 'on_raw_bulk_message_delete')
         if log_message:
             await log_message.edit(view=UnAuthoredPaginator(None, log_message, embeds))
 
     @commands.Cog.listener()
     async def on_guild_role_create(self, role: Role):
-        logger = await self._log_channel()
-        if not logger:
-            return
-        elif role.guild != self.bot.guild:
+        if self._ignored(role.guild):
             return
 
-        new_role_embed = Embed(
-            color=Color.green(),
-            description=role.mention)
-        new_role_embed.set_author(name='Role Created', icon_url=self.avatar)
+        new_role_embed = self.bot.embed_factory.build('Role Created', Color.green(), role.mention)
         new_role_embed.set_thumbnail(url=role.icon or role.guild.icon)
         new_role_embed.set_footer(text=f'Role ID: {role.id}')
 
         new_role_embed.add_field(name='Created At:', value=f'**{format_dt(role.created_at, "F")}**')
 
-        await self._try_send(logger, new_role_embed, 'on_guild_role_create')
+        self._log(new_role_embed, EmbedQueue.NORMAL, 'role_create')
 
     @commands.Cog.listener()
     async def on_guild_role_update(self, before: Role, after: Role):
-        logger = await self._log_channel()
-        if not logger:
-            return
-        elif before.guild != self.bot.guild:
-            return
-        elif before.id in self.ignored_roles:
+        if self._ignored(before.guild, 0, [before]):
             return
         elif before.name == after.name and before.color == after.color:
             return
 
-        edited_role_embed = Embed(
-            color=Color.blue(),
-            description=before.mention)
-        edited_role_embed.set_author(name='Role Updated', icon_url=self.avatar)
+        edited_role_embed = self.bot.embed_factory.build('Role Updated', Color.blue(), before.mention)
         edited_role_embed.set_thumbnail(url=after.icon or after.guild.icon)
         edited_role_embed.set_footer(text=f'Role ID: {after.id}')
 
@@ -173,96 +318,63 @@ class EventLogger(commands.Cog):
         edited_role_embed.add_field(
             name='After:', value=f'Name: `{after.name}`\nColor: `{after.color}`', inline=False)
 
-        await self._try_send(logger, edited_role_embed, 'on_guild_role_update')
+        self._log(edited_role_embed, EmbedQueue.NORMAL, 'role_update')
 
     @commands.Cog.listener()
     async def on_guild_role_delete(self, role: Role):
-        logger = await self._log_channel()
-        if not logger:
-            return
-        elif role.guild != self.bot.guild:
-            return
-        elif role.id in self.ignored_roles:
+        if self._ignored(role.guild, 0, [role]):
             return
 
-        deleted_role_embed = Embed(
-            color=Color.red(),
-            description=f'`{role.name}`')
-        deleted_role_embed.set_author(name='Role Deleted', icon_url=self.avatar)
+        deleted_role_embed = self.bot.embed_factory.build('Role Deleted', Color.red(), f'`{role.name}`')
         deleted_role_embed.set_thumbnail(url=role.icon or role.guild.icon)
         deleted_role_embed.set_footer(text=f'Role ID: {role.id}')
 
         deleted_role_embed.add_field(name='Created At:', value=f'**{format_dt(role.created_at, "F")}**')
 
-        await self._try_send(logger, deleted_role_embed, 'on_guild_role_delete')
+        self._log(deleted_role_embed, EmbedQueue.HIGH, 'role_delete')
 
     @commands.Cog.listener()
     async def on_guild_channel_create(self, channel: GuildChannel):
-        logger = await self._log_channel()
-        if not logger:
-            return
-        elif channel.guild != self.bot.guild:
+        if self._ignored(channel.guild):
             return
 
-        new_channel_embed = Embed(
-            color=Color.green(),
-            description=channel.mention)
-        new_channel_embed.set_author(name='Channel Created', icon_url=self.avatar)
+        new_channel_embed = self.bot.embed_factory.build('Channel Created', Color.green(), channel.mention)
         new_channel_embed.set_thumbnail(url=channel.guild.icon)
         new_channel_embed.set_footer(text=f'Channel ID: {channel.id}')
 
         new_channel_embed.add_field(name='Created At:', value=f'**{format_dt(channel.created_at, "F")}**')
 
-        await self._try_send(logger, new_channel_embed, 'on_guild_channel_create')
+        self._log(new_channel_embed, EmbedQueue.NORMAL, 'channel_create', channel_id=channel.id)
 
     @commands.Cog.listener()
     async def on_guild_channel_delete(self, channel: GuildChannel):
-        logger = await self._log_channel()
-        if not logger:
-            return
-        elif channel.guild != self.bot.guild:
-            return
-        elif channel.id in self.ignored_channels:
+        if self._ignored(channel.guild, channel.id):
             return
 
-        deleted_channel_embed = Embed(
-            color=Color.red(),
-            description=f'`#{channel.name}`')
-        deleted_channel_embed.set_author(name='Channel Deleted', icon_url=self.avatar)
+        deleted_channel_embed = self.bot.embed_factory.build('Channel Deleted', Color.red(), f'`#{channel.name}`')
         deleted_channel_embed.set_thumbnail(url=channel.guild.icon)
         deleted_channel_embed.set_footer(text=f'Channel ID: {channel.id}')
 
         deleted_channel_embed.add_field(name='Created At:', value=f'**{format_dt(channel.created_at, "F")}**')
 
-        await self._try_send(logger, deleted_channel_embed, 'on_guild_channel_delete')
+        self._log(deleted_channel_embed, EmbedQueue.HIGH, 'channel_delete', channel_id=channel.id)
 
     @commands.Cog.listener()
     async def on_member_join(self, member: Member):
-        logger = await self._log_channel()
-        if not logger:
-            return
-        elif member.guild != self.bot.guild:
+        if self.bot.raid_mode is True or self._ignored(member.guild):
             return
 
-        new_member_embed = Embed(
-            color=Color.green(),
-            description=member.mention)
-        new_member_embed.set_author(name='Member Joined', icon_url=self.avatar)
+        new_member_embed = self.bot.embed_factory.build('Member Joined', Color.green(), member.mention)
         new_member_embed.set_thumbnail(url=member.avatar or member.default_avatar)
         new_member_embed.set_footer(text=f'User ID: {member.id}')
 
         new_member_embed.add_field(name='Account Created:', value=f'**{format_dt(member.created_at, "F")}**')
 
-        await self._try_send(logger, new_member_embed, 'on_member_join')
+        self._log(new_member_embed, EmbedQueue.NORMAL, 'member_join', member.id)
 
     @commands.Cog.listener()
     async def on_member_update(self, before: Member, after: Member):
-        logger = await self._log_channel()
-        if not logger:
-            return
-        elif before.guild != self.bot.guild:
-            return
-        elif [role for role in before.roles + after.roles if role.id in self.ignored_roles]:
+        if self._ignored(before.guild, 0, before.roles, after.roles):
             return
 
         if before.nick != after.nick:
@@ -294,10 +406,7 @@ class EventLogger(commands.Cog):
         else:
             return
 
-        edited_member_embed = Embed(
-            color=Color.blue(),
-            description=before.mention)
-        edited_member_embed.set_author(name=author_name, icon_url=self.avatar)
+        edited_member_embed = self.bot.embed_factory.build(author_name, Color.blue(), before.mention)
         edited_member_embed.set_thumbnail(url=after.avatar or after.default_avatar)
         edited_member_embed.set_footer(text=f'User ID: {before.id}')
 
@@ -305,83 +414,57 @@ class EventLogger(commands.Cog):
             edited_member_embed.add_field(name=field_name, value=field_text, inline=False)
         edited_member_embed.add_field(name='Account Created:', value=f'**{format_dt(before.created_at, "F")}**')
 
-        await self._try_send(logger, edited_member_embed, 'on_member_update')
+        priority = EmbedQueue.HIGH if author_name == 'Member Timed Out' else EmbedQueue.NORMAL
+        self._log(edited_member_embed, priority, 'member_update', before.id)
 
     @commands.Cog.listener()
     async def on_member_remove(self, member: Member):
-        logger = await self._log_channel()
-        if not logger:
-            return
-        elif member.guild != self.bot.guild:
-            return
-        elif [role for role in member.roles if role.id in self.ignored_roles]:
+        if self._ignored(member.guild, 0, member.roles):
             return
 
-        left_member_embed = Embed(
-            color=Color.red(),
-            description=member.mention)
-        left_member_embed.set_author(name='Member Left', icon_url=self.avatar)
+        left_member_embed = self.bot.embed_factory.build('Member Left', Color.red(), member.mention)
         left_member_embed.set_thumbnail(url=member.avatar or member.default_avatar)
         left_member_embed.set_footer(text=f'User ID: {member.id}')
 
         left_member_embed.add_field(name='Account Created:', value=f'**{format_dt(member.created_at, "F")}**')
 
-        await self._try_send(logger, left_member_embed, 'on_member_remove')
+        self._log(left_member_embed, EmbedQueue.NORMAL, 'member_remove', member.id)
 
     @commands.Cog.listener()
     async def on_member_ban(self, guild: Guild, user: User | Member):
         if user.id not in self.bot.bans:
             self.bot.bans.append(user.id)
 
-        logger = await self._log_channel()
-        if not logger:
-            return
-        elif guild != self.bot.guild:
-            return
-        elif isinstance(user, Member) and [role for role in user.roles if role.id in self.ignored_roles]:
+        if self._ignored(guild, 0, user.roles if isinstance(user, Member) else ()):
             return
 
-        banned_embed = Embed(
-            color=Color.red(),
-            description=user.mention)
-        banned_embed.set_author(name='User Banned', icon_url=self.avatar)
+        banned_embed = self.bot.embed_factory.build('User Banned', Color.red(), user.mention)
         banned_embed.set_thumbnail(url=user.avatar or user.default_avatar)
         banned_embed.set_footer(text=f'User ID: {user.id}')
 
         banned_embed.add_field(name='Account Created', value=f'**{format_dt(user.created_at, "F")}**')
 
-        await self._try_send(logger, banned_embed, 'on_member_ban')
+        self._log(banned_embed, EmbedQueue.HIGH, 'member_ban', user.id)
 
     @commands.Cog.listener()
     async def on_member_unban(self, guild: Guild, user: User):
         if user.id in self.bot.bans:
             self.bot.bans.remove(user.id)
 
-        logger = await self._log_channel()
-        if not logger:
-            return
-        elif guild != self.bot.guild:
+        if self._ignored(guild):
             return
 
-        unbanned_embed = Embed(
-            color=Color.green(),
-            description=user.mention)
-        unbanned_embed.set_author(name='User Unbanned', icon_url=self.avatar)
+        unbanned_embed = self.bot.embed_factory.build('User Unbanned', Color.green(), user.mention)
         unbanned_embed.set_thumbnail(url=user.avatar or user.default_avatar)
         unbanned_embed.set_footer(text=f'User ID: {user.id}')
 
         unbanned_embed.add_field(name='Account Created', value=f'**{format_dt(user.created_at, "F")}**')
 
-        await self._try_send(logger, unbanned_embed, 'on_member_unban')
+        self._log(unbanned_embed, EmbedQueue.HIGH, 'member_unban', user.id)
 
     @commands.Cog.listener()
     async def on_voice_state_update(self, member: Member, before: VoiceState, after: VoiceState):
-        logger = await self._log_channel()
-        if not logger:
-            return
-        elif member.guild != self.bot.guild:
-            return
-        elif [role for role in member.roles if role.id in self.ignored_roles]:
+        if self._ignored(member.guild, 0, member.roles):
             return
 
         if not before.channel and after.channel:
@@ -402,16 +485,13 @@ class EventLogger(commands.Cog):
         else:
             return
 
-        vc_embed = Embed(
-            color=color,
-            description=member.mention)
-        vc_embed.set_author(name=author_name, icon_url=self.avatar)
+        vc_embed = self.bot.embed_factory.build(author_name, color, member.mention)
         vc_embed.set_thumbnail(url=member.avatar or member.default_avatar)
         vc_embed.set_footer(text=f'User ID: {member.id}')
 
         vc_embed.add_field(name='Voice Channel:', value=field_text)
 
-        await self._try_send(logger, vc_embed, 'on_voice_state_update')
+        self._log(vc_embed, EmbedQueue.LOW, 'voice_update', member.id, (after.channel or before.channel).id)
 
 
 async def setup(bot: CustomBot):
@@ -16,6 +16,9 @@ class WelcomeListener(commands.Cog):
 
     @commands.Cog.listener(name='on_member_join')
     async def welcome_members(self, member: Member):
+        # Joins are summarised by the anti-raid digest instead
+        if self.bot.raid_mode is True:
+            return
         general = await self.bot.metadata.get_channel('general')
         if general:
             try:
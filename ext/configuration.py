@@ -26,6 +26,8 @@ class ConfigurationCommands(commands.Cog):
                       'smod': 'Senior Mod', 'rmod': 'Moderator', 'tmod': 'Trainee Mod'}
     BLACKLIST_TYPES = Literal['suggest', 'trivia', 'appeal']
     IGNORED_TYPES = Literal['event', 'auto_mod']
+    DIGEST_TYPES = Literal['voice_update', 'member_join', 'member_remove', 'member_update', 'role_create',
+                           'role_update', 'channel_create', 'message_edit']
 
     def __init__(self, bot: CustomBot):
         self.bot = bot
@@ -96,6 +98,12 @@ class ConfigurationCommands(commands.Cog):
                                [f'<@&{r}>' for r in metadata.event_ignored_roles]) or ['**`None`**']),
                 inline=False)
 
+            config_embed.add_field(
+                name='Logger Digests:',
+                value=' '.join(f'`{event}: {threshold}`' for event, threshold in metadata.log_digest.items()) or
+                '**`Default`**',
+                inline=False)
+
             config_embed.add_field(
                 name='Miscellaneous:',
                 value=f'> **Welcome Message: `{metadata.welcome_msg}`**\n'
@@ -262,6 +270,26 @@ class ConfigurationCommands(commands.Cog):
         await self.bot.mongo_db.update_metadata(**{f'{ignored_type}_ignored_{str_type}': id_list})
         await self.bot.good_embed(ctx, msg)
 
+    @commands.command(
+        name='config-digest',
+        aliases=[],
+        description='Sets how many events of a type the logger posts per minute before switching to a single digest '
+                    'embed. `0` always digests the event type, `-1` never does, `default` resets it.',
+        extras={'requirement': 9}
+    )
+    async def config_digest(self, ctx: CustomContext, event_type: DIGEST_TYPES, threshold: int | Literal['default']):
+        digest = dict(self.bot.metadata.log_digest)
+        if threshold == 'default':
+            digest.pop(event_type, None)
+            msg = f'*Reset the `{event_type}` digest threshold to its default.*'
+        elif threshold < -1:
+            raise Exception('Threshold must be `-1` or more.')
+        else:
+            digest[event_type] = threshold
+            msg = f'*Set the `{event_type}` digest threshold to `{threshold}` events per minute.*'
+        await self.bot.mongo_db.update_metadata(log_digest=digest)
+        await self.bot.good_embed(ctx, msg)
+
     @commands.command(
         name='embed',
         aliases=[],
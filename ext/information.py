@@ -44,6 +44,36 @@ class InformationCommands(commands.Cog):
     async def uptime(self, ctx: CustomContext):
         await self.bot.good_embed(ctx, f'*Current uptime: `{timedelta(seconds=round(time() - self.bot.start_time))}`.*')
 
+    @commands.command(
+        name='logstats',
+        aliases=[],
+        description='Shows the queue depth, dropped embeds and delivery lag of the bot\'s log dispatchers.',
+        extras={'requirement': 8}
+    )
+    async def logstats(self, ctx: CustomContext):
+        queues = {
+            'Event Logger': getattr(self.bot.get_cog('EventLogger'), 'dispatcher', None),
+            'Auto-Mod': getattr(self.bot.get_cog('AutoModerator'), 'log_queue', None)
+        }
+
+        logstats_embed = Embed(color=Color.blue())
+        logstats_embed.set_author(name='Log Dispatchers', icon_url=self.bot.user.avatar or self.bot.user.default_avatar)
+
+        for name, queue in queues.items():
+            if queue is None:
+                continue
+            m = queue.metrics()
+            logstats_embed.add_field(
+                name=f'{name}:',
+                value=f'> **Queued: `{m["high_depth"]:,}` high, `{m["normal_depth"]:,}` normal, '
+                      f'`{m["low_depth"]:,}` low**\n'
+                      f'> **Dropped: `{m["normal_dropped"]:,}` normal, `{m["low_dropped"]:,}` low**\n'
+                      f'> **Sent: `{m["sent"]:,}`**\n'
+                      f'> **Delivery Lag: `{m["last_lag"]:.1f}s` (Max: `{m["max_lag"]:.1f}s`)**',
+                inline=False)
+
+        await ctx.send(embed=logstats_embed)
+
     @commands.command(
         name='avatar',
         aliases=['av'],
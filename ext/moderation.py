@@ -486,11 +486,8 @@ class ModerationCommands(commands.Cog):
         duration_s = modlog.duration
         duration = 'permanent' if duration_s == self.bot.perm_duration else str(timedelta(seconds=duration_s))
 
-        modlog_embed = CustomEmbed(
-            description=f'{user.mention} **(Case {modlog.id})**',
-            color=Color.blue()
-        )
-        modlog_embed.set_author(name='Modlog Created', icon_url=self.bot.user.avatar or self.bot.user.default_avatar)
+        modlog_embed = self.bot.embed_factory.build(
+            'Modlog Created', Color.blue(), f'{user.mention} **(Case {modlog.id})**', cls=CustomEmbed)
         modlog_embed.set_thumbnail(url=user.avatar or user.default_avatar)
         modlog_embed.set_footer(text=f'User ID: {user.id}')
 
@@ -508,8 +505,7 @@ class ModerationCommands(commands.Cog):
         )
 
         try:
-            # noinspection PyUnresolvedReferences
-            await pmc.send(embed=modlog_embed)
+            await self.bot.log_sink.send(pmc, embed=modlog_embed)
         except (HTTPException, AttributeError) as error:
             logging.error(f'Failed to post new Modlog entry into {pmc.id} - {error}')
 
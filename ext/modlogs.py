@@ -1,7 +1,9 @@
 from datetime import timedelta
+from typing import Literal
 
 from discord.utils import utcnow
 from discord.ext import commands
+from discord.abc import GuildChannel
 from discord import (
     User,
     HTTPException
@@ -39,6 +41,11 @@ class ModLogsCommands(commands.Cog):
         'channel_unban': 'Channel Unban'
     }
 
+    _event_types = Literal[
+        'message_edit', 'message_delete', 'role_create', 'role_update', 'role_delete', 'channel_create',
+        'channel_delete', 'member_join', 'member_update', 'member_remove', 'member_ban', 'member_unban', 'voice_update'
+    ]
+
     def __init__(self, bot: CustomBot):
         self.bot = bot
 
@@ -173,6 +180,33 @@ class ModLogsCommands(commands.Cog):
         message = await ctx.send(embed=embeds[0])
         await message.edit(view=Paginator(ctx.author, message, embeds))
 
+    @commands.command(
+        name='logsearch',
+        aliases=['searchlogs', 'ls'],
+        description='Searches archived server log events for a user or channel, optionally filtered by event type.',
+        extras={'requirement': 3}
+    )
+    async def logsearch(
+            self, ctx: CustomContext, target: User | GuildChannel, lookback: str = '7d', event: _event_types = None):
+        since = (utcnow() - self.bot.convert_duration(lookback)).timestamp()
+        key = 'channel_id' if isinstance(target, GuildChannel) else 'user_id'
+
+        async with ctx.typing():
+            events = await self.bot.archive.search(**{key: target.id}, type=event, since=since)
+        if not events:
+            raise Exception('No archived events found.')
+
+        fields = [EmbedField(
+            name=entry['type'].replace('_', ' ').title(),
+            text=f'**User:** <@{entry["user_id"]}>\n' * bool(entry['user_id']) +
+                 f'**Channel:** <#{entry["channel_id"]}>\n' * bool(entry['channel_id']) +
+                 f'**Logged:** <t:{int(entry["created"])}:F>\n'
+                 f'**Summary:** {entry["summary"][:768] or "`None`"}') for entry in events]
+        embeds = self.bot.fields_to_embeds(fields, title=f'Archived Events for {target.name} ({len(events):,})')
+
+        message = await ctx.send(embed=embeds[0])
+        await message.edit(view=Paginator(ctx.author, message, embeds))
+
     @commands.command(
         name='reason',
         aliases=['r'],
@@ -1,13 +1,14 @@
 import asyncio
 import logging
 from time import time
-from datetime import timedelta
+from datetime import timedelta, datetime, timezone
 from typing import AsyncIterator
 
 from discord.ext import commands, tasks
 from discord.abc import GuildChannel
 from discord.utils import utcnow, format_dt
 from discord import (
+    ClientException,
     HTTPException,
     VoiceState,
     Message,
@@ -18,14 +19,32 @@ from discord import (
 )
 
 from main import CustomBot
+from core.columns import MessageBuffer, VoiceBuffer
+from core.activity import (
+    activity_updates,
+    daily_series,
+    floor_month,
+    floor_hour,
+    floor_day,
+    next_month,
+    next_day,
+    sparkline,
+    heatmap as render_heatmap
+)
+from core.leaderboard import LeaderboardCache, BUCKET, bucket_of, bucket_totals, new_totals, top, rank
 from core.context import CustomContext
 from core.errors import ModLogNotFound
+from core.concurrency import gather_limited
 
 
 class UserStatistics(commands.Cog):
 
     ACTIVE_ROLE_LOOKBACK = 2419200
     ACTIVE_ROLE_LIMIT = 10
+    ROLE_EDIT_CONCURRENCY = 5
+    MEMBER_QUERY_CHUNK = 100
+    LEADERBOARD_LOOKBACKS = (86400, 604800, 2419200)
+    DAILY_RETENTION = 31536000
 
     MOD_STAT_TYPES = {'dm': 'DMs', 'warn': 'Warns', 'kick': 'Kicks',
                       'mute': 'Mutes', 'ban': 'Bans', 'channel_ban': 'Channel Bans',
@@ -33,86 +52,230 @@ class UserStatistics(commands.Cog):
 
     def __init__(self, bot: CustomBot):
         self.bot = bot
-        self.msg_stats, self.vc_stats, self.pending_vc_stats = [], [], []
-
-    def cog_load(self) -> None:
-        for loop in self.handle_stats, self.purge_old_stats:
+        self.msg_stats, self.vc_stats = MessageBuffer(), VoiceBuffer()
+        # user_id -> (channel_id, joined) of each open voice session, `joined` moves forward on every checkpoint
+        self.pending_vc_stats: dict[int, tuple[int, float]] = {}
+        self.leaderboards = LeaderboardCache(self.LEADERBOARD_LOOKBACKS)
+        # Window start -> totals stitched from the rollup tiers, cleared whenever new statistics are flushed
+        self.stitched: dict[float, dict[str, dict]] = {}
+
+    async def cog_load(self) -> None:
+        await self.bot.mongo_db.ensure_stats_indexes()
+        for loop in self.handle_stats, self.reconcile_active_role, self.purge_old_stats:
             loop.add_exception_type(Exception)
             loop.start()
 
-    def cog_unload(self) -> None:
-        for loop in self.handle_stats, self.purge_old_stats:
+    async def cog_unload(self) -> None:
+        for loop in self.handle_stats, self.reconcile_active_role, self.purge_old_stats:
             loop.cancel()
             loop.clear_exception_types()
+        try:
+            self._checkpoint_vc(time())
+            await self._dump_stats()
+        except Exception as error:
+            logging.error(f'Failed to flush user statistics on unload - {error}')
+
+    def _checkpoint_vc(self, now: float) -> None:
+        # Open sessions are written up to now and restarted, so a crash loses at most one flush interval of VC time
+        for user_id, (channel_id, joined) in self.pending_vc_stats.items():
+            self.vc_stats.append(user_id, channel_id, joined, now)
+            self.pending_vc_stats[user_id] = (channel_id, now)
+
+    async def _dump_stats(self) -> dict[int, dict[str, dict]]:
+        # Swap the buffers out rather than copying them, rows are only turned into documents for the insert
+        _msg, self.msg_stats = self.msg_stats, self.msg_stats.empty()
+        _vc, self.vc_stats = self.vc_stats, self.vc_stats.empty()
+        await self.bot.mongo_db.dump_msg_stats(_msg.documents())
+        await self.bot.mongo_db.dump_vc_stats(_vc.documents())
+
+        # The same rows are rolled up into hourly totals for the activity buckets and the leaderboard cache
+        changes = bucket_totals(zip(_msg.user_id, _msg.channel_id, _msg.created), _vc.rows())
+        await self.bot.mongo_db.dump_activity_buckets(activity_updates(changes, self.bot.guild_id))
+        return changes
+
+    async def _warm_leaderboards(self, now: float) -> None:
+        lookback = max(self.LEADERBOARD_LOOKBACKS)
+        messages = [(entry.get('user_id'), entry.get('channel_id'), entry.get('created', 0))
+                    async for entry in self.bot.mongo_db.get_msg_stats(lookback)]
+        sessions = [(entry.get('user_id'), entry.get('channel_id'), entry.get('joined', 0), entry.get('left', 0))
+                    async for entry in self.bot.mongo_db.get_vc_stats(lookback)]
+        changes = bucket_totals(messages, sessions)
+        self.leaderboards.reset(now)
+        self.leaderboards.ingest(changes, now)
+
+        # Buckets only start with the first flush after they were introduced, older hours are rebuilt from raw stats
+        oldest = await self.bot.mongo_db.get_activity_bound('hour', latest=False)
+        if oldest is None or oldest > bucket_of(now - lookback) + BUCKET:
+            await self.bot.mongo_db.dump_activity_buckets(activity_updates(changes, self.bot.guild_id), replace=True)
+
+    def _plan(self, seconds: float) -> list[tuple[str, float, float]]:
+        # The newest span is read from the finest tier still holding it, every older span from the next coarser one
+        now = utcnow()
+        since = now - timedelta(seconds=seconds)
+        tiers = (('hour', next_day(now - timedelta(seconds=self.ACTIVE_ROLE_LOOKBACK)), floor_hour),
+                 ('day', next_month(now - timedelta(seconds=self.DAILY_RETENTION)), floor_day),
+                 ('month', None, floor_month))
+
+        plan, end = [], floor_hour(now) + timedelta(hours=1)
+        for tier, boundary, floor in tiers:
+            start = floor(since)
+            if boundary is not None and start < boundary:
+                plan.append((tier, boundary.timestamp(), end.timestamp()))
+                end = boundary
+                continue
+            plan.append((tier, start.timestamp(), end.timestamp()))
+            break
+        return plan
+
+    async def _stitch_leaderboard(self, seconds: float) -> tuple[float, dict[str, dict]]:
+        plan = self._plan(seconds)
+        since = plan[-1][1]
+        if since in self.stitched:
+            return since, self.stitched[since]
+
+        stats = new_totals()
+        for tier, start, end in plan:
+            for entry in await self.bot.mongo_db.get_activity_totals(tier, start, end):
+                target_id = entry['_id']['target_id']
+                mc, vt = ('umc', 'uvt') if entry['_id']['scope'] == 'user' else ('cmc', 'cvt')
+                if entry.get('messages'):
+                    stats[mc][target_id] = stats[mc].get(target_id, 0) + entry['messages']
+                if entry.get('vc_time'):
+                    stats[vt][target_id] = stats[vt].get(target_id, 0) + entry['vc_time']
+        self.stitched[since] = stats
+        return since, stats
+
+    async def _leaderboard(self, seconds: float) -> tuple[float, dict[str, dict], float]:
+        # Lookbacks past the raw data are stitched together from the rollup tiers
+        if seconds > self.ACTIVE_ROLE_LOOKBACK:
+            since, stats = await self._stitch_leaderboard(seconds)
+            return since, stats, self.leaderboards.refreshed or time()
+
+        # Served from the nearest cached window, the database is only scanned before the first flush has warmed it
+        if self.leaderboards.refreshed:
+            since, stats = self.leaderboards.nearest(seconds)
+            return since, stats, self.leaderboards.refreshed
+
+        seconds = min(seconds, self.ACTIVE_ROLE_LOOKBACK)
+        stats = await self.get_stats(self.bot.mongo_db.get_msg_stats(seconds), self.bot.mongo_db.get_vc_stats(seconds))
+        now = time()
+        return now - seconds, stats, now
 
     @tasks.loop(minutes=5)
     async def handle_stats(self) -> None:
         await self.bot.wait_until_ready()
         await asyncio.sleep(45)
 
-        _msg, _vc = [_ for _ in self.msg_stats], [_ for _ in self.vc_stats]
-        self.msg_stats, self.vc_stats = [], []
-        await self.bot.mongo_db.dump_msg_stats(_msg)
-        await self.bot.mongo_db.dump_vc_stats(_vc)
+        now = time()
+        self._checkpoint_vc(now)
+        changes = await self._dump_stats()
+
+        # The flushed rows are folded into the cached windows instead of re-reading every window from the database
+        if self.leaderboards.refreshed:
+            self.leaderboards.ingest(changes, now)
+        else:
+            await self._warm_leaderboards(now)
+        self.stitched = {}
+
+    async def _members(self, user_ids: set[int]) -> list[Member]:
+        members = [member for user_id in user_ids if (member := self.bot.guild.get_member(user_id))]
+        missing = list(user_ids - {member.id for member in members})
+        # Uncached members are requested over the gateway in chunks rather than fetched one by one
+        for i in range(0, len(missing), self.MEMBER_QUERY_CHUNK):
+            chunk = missing[i:i + self.MEMBER_QUERY_CHUNK]
+            try:
+                members += await self.bot.guild.query_members(user_ids=chunk, limit=len(chunk))
+            except (HTTPException, ClientException, asyncio.TimeoutError) as error:
+                logging.error(f'Failed to query members for the active role - {error}')
+        return members
+
+    @tasks.loop(minutes=5)
+    async def reconcile_active_role(self) -> None:
+        await self.bot.wait_until_ready()
+        # Runs apart from `handle_stats` so slow role edits never hold up the next flush
+        if not self.leaderboards.refreshed:
+            return
 
         active_role = await self.bot.metadata.get_role('active')
         if not active_role:
             return
 
-        msg_stats = self.bot.mongo_db.get_msg_stats(lookback=self.ACTIVE_ROLE_LOOKBACK)
-        vc_stats = self.bot.mongo_db.get_vc_stats(lookback=self.ACTIVE_ROLE_LOOKBACK)
-        sorted_stats = await self.get_sorted_stats(msg_stats, vc_stats)
-
-        _l = self.ACTIVE_ROLE_LIMIT
-
-        top_10_msg_users, top_10_vc_users = list(sorted_stats.get('umc', {})), list(sorted_stats.get('uvt', {}))
-        top_10_msg_users = top_10_msg_users if len(top_10_msg_users) < _l else top_10_msg_users[:_l]
-        top_10_vc_users = top_10_vc_users if len(top_10_vc_users) < _l else top_10_vc_users[:_l]
-
-        top_users: set[int] = set(top_10_msg_users + top_10_vc_users)
-        role_users: list[int] = [user.id for user in active_role.members]
+        start = time()
+        _, stats = self.leaderboards.nearest(self.ACTIVE_ROLE_LOOKBACK)
+        top_users = {user_id for key in ('umc', 'uvt') for user_id, _ in top(stats[key], self.ACTIVE_ROLE_LIMIT)}
+        role_users = {member.id: member for member in active_role.members}
 
-        user_ids_in = [user_id for user_id in top_users if user_id not in role_users]
-        user_ids_out = [user_id for user_id in role_users if user_id not in top_users]
-
-        for user_id in user_ids_in:
-            try:
-                member = self.bot.guild.get_member(user_id) or await self.bot.guild.fetch_member(user_id)
-                await member.add_roles(active_role)
-            except HTTPException:
-                pass
+        user_ids_out = role_users.keys() - top_users
+        members_in = await self._members(top_users - role_users.keys())
+        if not members_in and not user_ids_out:
+            return
 
-        for user_id in user_ids_out:
-            try:
-                member = self.bot.guild.get_member(user_id) or await self.bot.guild.fetch_member(user_id)
-                await member.remove_roles(active_role)
-            except HTTPException:
-                pass
+        results = await gather_limited([member.add_roles(active_role) for member in members_in] +
+                                       [role_users[user_id].remove_roles(active_role) for user_id in user_ids_out],
+                                       self.ROLE_EDIT_CONCURRENCY)
+        failed = sum(isinstance(result, Exception) for result in results)
+        logging.info(f'Reconciled the active role in {time() - start:.2f}s - {len(members_in)} added, '
+                     f'{len(user_ids_out)} removed, {failed} failed.')
+
+    async def _compact_activity(self) -> None:
+        now = utcnow()
+        for source, tier, floor, step in (('hour', 'day', floor_day, next_day),
+                                          ('day', 'month', floor_month, next_month)):
+            # Resumes from the newest rollup, which is recomputed in case statistics for it were flushed late
+            latest = (await self.bot.mongo_db.get_activity_bound(tier) or
+                      await self.bot.mongo_db.get_activity_bound(source, latest=False))
+            if latest is None:
+                continue
+
+            # Only whole periods are rolled up, the current day and month are still read from the finer tier
+            start, current = floor(datetime.fromtimestamp(latest, tz=timezone.utc)), floor(now)
+            while start < current:
+                end = step(start)
+                await self.bot.mongo_db.compact_activity(source, tier, start.timestamp(), end.timestamp())
+                start = end
 
     @tasks.loop(hours=1)
     async def purge_old_stats(self) -> None:
         await self.bot.wait_until_ready()
 
+        # Rollups are brought up to date first so nothing is purged before it has been compacted
+        start = time()
+        await self._compact_activity()
         result = await self.bot.mongo_db.purge_old_stats(self.ACTIVE_ROLE_LOOKBACK)
+        result += await self.bot.mongo_db.purge_activity('day', time() - self.DAILY_RETENTION)
 
-        logging.info(f'Purged {result} documents of old user statistics.')
+        logging.info(f'Compacted activity and purged {result} documents of old user statistics '
+                     f'in {time() - start:.2f}s.')
 
     def _on_join_vc(self, member: Member, after: VoiceState) -> None:
-        vc_dict = {
-            'user_id': member.id,
-            'channel_id': after.channel.id,
-            'joined': time(),
-        }
-        self.pending_vc_stats.append(vc_dict)
+        self.pending_vc_stats[member.id] = (after.channel.id, time())
 
     def _on_leave_vc(self, member: Member) -> None:
-        try:
-            ongoing = [vc_stat for vc_stat in self.pending_vc_stats if vc_stat['user_id'] == member.id][0]
-        except IndexError:
+        ongoing = self.pending_vc_stats.pop(member.id, None)
+        if ongoing is None:
             return
-        self.pending_vc_stats.remove(ongoing)
-        ongoing['left'] = time()
-        self.vc_stats.append(ongoing)
+        self.vc_stats.append(member.id, *ongoing, time())
+
+    @commands.Cog.listener()
+    async def on_ready(self) -> None:
+        guild = self.bot.get_guild(self.bot.guild_id)
+        if guild is None:
+            return
+
+        now = time()
+        in_vc = {member.id: channel.id for channel in guild.voice_channels + guild.stage_channels
+                 for member in channel.members if not member.bot}
+
+        # Sessions whose leave event was missed while disconnected are closed, members already in VC are picked up
+        for user_id in [user_id for user_id in self.pending_vc_stats if in_vc.get(user_id) is None]:
+            self.vc_stats.append(user_id, *self.pending_vc_stats.pop(user_id), now)
+        for user_id, channel_id in in_vc.items():
+            ongoing = self.pending_vc_stats.get(user_id)
+            if ongoing is not None and ongoing[0] != channel_id:
+                self.vc_stats.append(user_id, *ongoing, now)
+                ongoing = None
+            if ongoing is None:
+                self.pending_vc_stats[user_id] = (channel_id, now)
 
     @commands.Cog.listener()
     async def on_voice_state_update(self, member: Member, before: VoiceState, after: VoiceState) -> None:
@@ -134,16 +297,10 @@ class UserStatistics(commands.Cog):
         if not message.guild or message.guild.id != self.bot.guild_id or message.author.bot:
             return
 
-        msg_dict = {
-            'user_id': message.author.id,
-            'message_id': message.id,
-            'channel_id': message.channel.id,
-            'created': time()
-        }
-        self.msg_stats.append(msg_dict)
+        self.msg_stats.append(message.author.id, message.id, message.channel.id, time())
 
     @staticmethod
-    async def get_sorted_stats(msg_stats: AsyncIterator[dict], vc_stats: AsyncIterator[dict]) -> dict[str, dict]:
+    async def get_stats(msg_stats: AsyncIterator[dict], vc_stats: AsyncIterator[dict]) -> dict[str, dict]:
         umc, cmc, uvt, cvt = {}, {}, {}, {}
 
         async for entry in msg_stats:
@@ -171,11 +328,6 @@ class UserStatistics(commands.Cog):
             except KeyError:
                 cvt[channel] = vc_td
 
-        umc = {k: i for k, i in sorted(umc.items(), key=lambda x: x[1], reverse=True)}
-        cmc = {k: i for k, i in sorted(cmc.items(), key=lambda x: x[1], reverse=True)}
-        uvt = {k: i for k, i in sorted(uvt.items(), key=lambda x: x[1], reverse=True)}
-        cvt = {k: i for k, i in sorted(cvt.items(), key=lambda x: x[1], reverse=True)}
-
         return {'umc': umc, 'cmc': cmc, 'uvt': uvt, 'cvt': cvt}
 
     @commands.command(
@@ -187,24 +339,13 @@ class UserStatistics(commands.Cog):
     @commands.cooldown(1, 30, commands.BucketType.user)
     async def topstats(self, ctx: CustomContext, lookback: str = '28d'):
         async with ctx.typing():
-            _time_delta = self.bot.convert_duration(lookback)
-            seconds = _time_delta.total_seconds()
-
-            if seconds > self.ACTIVE_ROLE_LOOKBACK:
-                _time_delta = self.bot.convert_duration('28d')
-                seconds = _time_delta.total_seconds()
+            seconds = self.bot.convert_duration(lookback).total_seconds()
+            since, stats, refreshed = await self._leaderboard(seconds)
 
-            msg_stats = self.bot.mongo_db.get_msg_stats(seconds)
-            vc_stats = self.bot.mongo_db.get_vc_stats(seconds)
+            umc, cmc = top(stats.get('umc', {}), 5), top(stats.get('cmc', {}), 5)
+            uvt, cvt = top(stats.get('uvt', {}), 5), top(stats.get('cvt', {}), 5)
 
-            sorted_stats = await self.get_sorted_stats(msg_stats, vc_stats)
-
-            umc = sorted_stats.get('umc', {})
-            cmc = sorted_stats.get('cmc', {})
-            uvt = sorted_stats.get('uvt', {})
-            cvt = sorted_stats.get('cvt', {})
-
-            since_dt = utcnow() - _time_delta
+            since_dt = datetime.fromtimestamp(since, tz=timezone.utc)
             avatar = self.bot.user.avatar
             guild = self.bot.guild
             nd = '`No data to be displayed`'
@@ -212,23 +353,24 @@ class UserStatistics(commands.Cog):
             topstats_embed = Embed(color=Color.blue(), title=guild, description=f'**Since {format_dt(since_dt, "F")}**')
             topstats_embed.set_author(name='Top Statistics', icon_url=avatar)
             topstats_embed.set_thumbnail(url=guild.icon or avatar)
-            topstats_embed.set_footer(text=f'Try out {self.bot.command_prefix}stats to view your own stats!')
+            topstats_embed.set_footer(text=f'Try out {self.bot.command_prefix}stats to view your own stats! - Updated')
+            topstats_embed.timestamp = datetime.fromtimestamp(refreshed, tz=timezone.utc)
 
             topstats_embed.add_field(
                 name='User Messages:',
-                value='\n'.join([f'> <@{u}>**: {umc[u]:,}**' for u in list(umc)[:5]]) or nd,
+                value='\n'.join([f'> <@{u}>**: {count:,}**' for u, count in umc]) or nd,
                 inline=False)
             topstats_embed.add_field(
                 name='Channel Messages:',
-                value='\n'.join([f'> <#{c}>**: {cmc[c]:,}**' for c in list(cmc)[:5]]) or nd,
+                value='\n'.join([f'> <#{c}>**: {count:,}**' for c, count in cmc]) or nd,
                 inline=False)
             topstats_embed.add_field(
                 name='User VC Activity:',
-                value='\n'.join([f'> <@{u}>**: `{timedelta(seconds=round(uvt[u]))}`**' for u in list(uvt)[:5]]) or nd,
+                value='\n'.join([f'> <@{u}>**: `{timedelta(seconds=round(vt))}`**' for u, vt in uvt]) or nd,
                 inline=False)
             topstats_embed.add_field(
                 name='Channel VC Activity:',
-                value='\n'.join([f'> <#{c}>**: `{timedelta(seconds=round(cvt[c]))}`**' for c in list(cvt)[:5]]) or nd,
+                value='\n'.join([f'> <#{c}>**: `{timedelta(seconds=round(vt))}`**' for c, vt in cvt]) or nd,
                 inline=False)
 
         await ctx.reply(embed=topstats_embed)
@@ -244,40 +386,42 @@ class UserStatistics(commands.Cog):
         async with ctx.typing():
             target = target or ctx.author
 
-            _time_delta = self.bot.convert_duration(lookback)
-            seconds = _time_delta.total_seconds()
-
-            if seconds > self.ACTIVE_ROLE_LOOKBACK:
-                _time_delta = self.bot.convert_duration(lookback)
-                seconds = _time_delta.total_seconds()
-
-            msg_stats = self.bot.mongo_db.get_msg_stats(seconds)
-            vc_stats = self.bot.mongo_db.get_vc_stats(seconds)
+            seconds = self.bot.convert_duration(lookback).total_seconds()
+            is_channel = isinstance(target, GuildChannel)
 
-            sorted_stats = await self.get_sorted_stats(msg_stats, vc_stats)
-
-            mc = sorted_stats.get('cmc' if isinstance(target, GuildChannel) else 'umc', {})
-            vt = sorted_stats.get('cvt' if isinstance(target, GuildChannel) else 'uvt', {})
-
-            try:
-                m_rank, m_count = f'#{list(mc).index(target.id) + 1}', mc[target.id]
-            except ValueError:
-                m_rank, m_count = 'N/A', 0
-            try:
-                v_rank, v_time = f'#{list(vt).index(target.id) + 1}', vt[target.id]
-            except ValueError:
-                v_rank, v_time = 'N/A', 0
+            mc, vt = ('cmc', 'cvt') if is_channel else ('umc', 'uvt')
 
-            since_dt = utcnow() - _time_delta
+            if seconds > self.ACTIVE_ROLE_LOOKBACK:
+                since, stats, refreshed = await self._leaderboard(seconds)
+                m_count, v_time = stats[mc].get(target.id, 0), stats[vt].get(target.id, 0)
+                ranked = True
+            else:
+                # Only the target's own documents are read, counted over the same window it is ranked against
+                if ranked := bool(self.leaderboards.refreshed):
+                    since, stats = self.leaderboards.nearest(seconds)
+                    refreshed = self.leaderboards.refreshed
+                else:
+                    since, stats, refreshed = time() - seconds, new_totals(), time()
+                m_count, v_time = await self.bot.mongo_db.get_target_stats(
+                    'channel_id' if is_channel else 'user_id', target.id, time() - since)
+
+            m_rank = rank(stats[mc], target.id, m_count) if m_count and ranked else None
+            v_rank = rank(stats[vt], target.id, v_time) if v_time and ranked else None
+            m_rank = f'#{m_rank}' if m_rank else 'N/A'
+            v_rank = f'#{v_rank}' if v_rank else 'N/A'
+
+            since_dt = datetime.fromtimestamp(since, tz=timezone.utc)
             avatar = self.bot.user.avatar
-            author = ('Channel' if isinstance(target, GuildChannel) else 'User') + ' Statistics'
+            author = ('Channel' if is_channel else 'User') + ' Statistics'
             guild = self.bot.guild
             url = target.avatar or target.default_avatar if isinstance(target, (User, Member)) else guild.icon or avatar
 
             stats_embed = Embed(color=Color.blue(), title=target, description=f'**Since {format_dt(since_dt, "F")}**')
             stats_embed.set_author(name=author, icon_url=avatar)
             stats_embed.set_thumbnail(url=url)
-            stats_embed.set_footer(text=f'Try out {self.bot.command_prefix}topstats to view the top rankings!')
+            stats_embed.set_footer(
+                text=f'Try out {self.bot.command_prefix}topstats to view the top rankings! - Updated')
+            stats_embed.timestamp = datetime.fromtimestamp(refreshed, tz=timezone.utc)
 
             stats_embed.add_field(
                 name=f'Total Messages ({m_rank}):',
@@ -290,6 +434,83 @@ class UserStatistics(commands.Cog):
 
         await ctx.reply(embed=stats_embed)
 
+    async def _activity(self, target: GuildChannel | User | None, lookback: str,
+                        tiers: tuple[str, ...]) -> tuple[float, list[dict]]:
+        if target is None:
+            scope, target_id = 'server', self.bot.guild_id
+        else:
+            scope, target_id = 'channel' if isinstance(target, GuildChannel) else 'user', target.id
+
+        # Tiers too coarse for the view are dropped, so the lookback is cut short where they would begin
+        plan = [segment for segment in self._plan(self.bot.convert_duration(lookback).total_seconds())
+                if segment[0] in tiers]
+        buckets = []
+        for tier, start, end in plan:
+            buckets += await self.bot.mongo_db.get_activity_buckets(tier, scope, target_id, start, end)
+        return plan[-1][1], buckets
+
+    def _activity_embed(self, target: GuildChannel | User | None, author: str, since: float) -> Embed:
+        guild = self.bot.guild
+        avatar = self.bot.user.avatar
+        url = target.avatar or target.default_avatar if isinstance(target, (User, Member)) else guild.icon or avatar
+
+        since_dt = datetime.fromtimestamp(since, tz=timezone.utc)
+        activity_embed = Embed(
+            color=Color.blue(), title=target or guild, description=f'**Since {format_dt(since_dt, "F")}**')
+        activity_embed.set_author(name=author, icon_url=avatar)
+        activity_embed.set_thumbnail(url=url)
+        activity_embed.set_footer(text='Hours and days are in UTC.')
+        return activity_embed
+
+    @commands.command(
+        name='heatmap',
+        aliases=['hm'],
+        description='View when a user, channel or (by default) the server is most active, by hour and weekday.',
+        extras={'requirement': 0}
+    )
+    @commands.cooldown(1, 30, commands.BucketType.user)
+    async def heatmap(self, ctx: CustomContext, target: GuildChannel | User = None, lookback: str = '28d'):
+        async with ctx.typing():
+            since, buckets = await self._activity(target, lookback, ('hour',))
+            if not buckets:
+                raise Exception('No activity recorded in that time.')
+
+            heatmap_embed = self._activity_embed(target, 'Activity Heatmap', since)
+            for name, field in ('Messages:', 'messages'), ('VC Activity:', 'vc_time'):
+                heatmap_embed.add_field(name=name, value=f'```\n{render_heatmap(buckets, field)}\n```', inline=False)
+
+        await ctx.reply(embed=heatmap_embed)
+
+    @commands.command(
+        name='activity',
+        aliases=['timeline'],
+        description='View the daily activity of a user, channel or (by default) the whole server.',
+        extras={'requirement': 0}
+    )
+    @commands.cooldown(1, 30, commands.BucketType.user)
+    async def activity(self, ctx: CustomContext, target: GuildChannel | User = None, lookback: str = '28d'):
+        async with ctx.typing():
+            since, buckets = await self._activity(target, lookback, ('hour', 'day'))
+            if not buckets:
+                raise Exception('No activity recorded in that time.')
+
+            now = time()
+            activity_embed = self._activity_embed(target, 'Daily Activity', since)
+            messages = daily_series(buckets, 'messages', since, now)
+            vc_time = daily_series(buckets, 'vc_time', since, now)
+
+            activity_embed.add_field(
+                name='Messages:',
+                value=f'`{sparkline(messages)}`\n> **Total: `{sum(messages):,}` - Peak: `{max(messages):,}`/day**',
+                inline=False)
+            activity_embed.add_field(
+                name='VC Activity:',
+                value=f'`{sparkline(vc_time)}`\n> **Total: `{timedelta(seconds=round(sum(vc_time)))}` - '
+                      f'Peak: `{timedelta(seconds=round(max(vc_time)))}`/day**',
+                inline=False)
+
+        await ctx.reply(embed=activity_embed)
+
     @commands.command(
         name='modstats',
         aliases=[],
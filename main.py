@@ -32,11 +32,13 @@ try:
     from resources import config
     from core.modlog import ModLogEntry
     from core.mongo import MongoDBClient
-    from core.embed import EmbedField, CustomEmbed
+    from core.embed import EmbedField, CustomEmbed, EmbedFactory
     from core.errors import DurationError, ModLogNotFound
     from core.context import CustomContext, enforce_clearance
     from core.help import CustomHelpCommand
     from core.metadata import MetaData
+    from core.webhooks import WebhookSink
+    from core.archive import EventArchive
     from components.traceback import TracebackView
     from components.roles import RoleView
 
@@ -62,7 +64,7 @@ class CustomBot(commands.Bot):
             owner_ids=config.OWNERS,
             help_command=CustomHelpCommand(),
             case_insensitive=True,
-            max_messages=10000
+            max_messages=1000
         )
 
         self.guild_id: int = config.GUILD_ID
@@ -70,6 +72,10 @@ class CustomBot(commands.Bot):
         self.mongo_db: MongoDBClient | None = None
         self.metadata: MetaData | None = None
         self.bans: list[int] = []
+        self.raid_mode: bool = False
+        self.log_sink: WebhookSink = WebhookSink(self)
+        self.embed_factory: EmbedFactory = EmbedFactory(self)
+        self.archive: EventArchive = EventArchive()
         self.perm_duration: int = 2 ** 32 - 1
 
         self.add_check(enforce_clearance, call_once=True)
@@ -346,7 +352,8 @@ class CustomBot(commands.Bot):
     def run_bot(self) -> None:
 
         async def _run_bot():
-            async with self, MongoDBClient(self, config.MONGO) as self.mongo_db:
+            # The bot is closed first so that cogs can still write to the database while unloading
+            async with MongoDBClient(self, config.MONGO) as self.mongo_db, self:
                 for folder in self.extension_folders:
                     for file in os.listdir(folder):
                         if file.endswith('.py'):
@@ -365,6 +372,8 @@ class CustomBot(commands.Bot):
         async def _cleanup():
             self.modlogs_tasks.cancel()
             self.init_status.cancel()
+            await self.archive.flush()
+            self.archive.close()
 
         # noinspection PyUnresolvedReferences
         with asyncio.Runner() as runner: